@@ -2,7 +2,7 @@
 ; irq_lz.asm - DeltaLZ In-IRQ Decoder
 ; ==========================================================================
 ;
-; Each IRQ: decode one LZ byte, delta-accumulate, cache for next IRQ.
+; Each IRQ: decode one LZ byte, delta-accumulate for the next IRQ to play.
 ; State machine: 0=token fetch, 1=literal run, 2=match copy.
 ;
 ; Decode buffer: $8000-$BFFF (16 KB). The COMPRESSOR guarantees:
@@ -14,12 +14,12 @@
 ; ZP_LZ_MATCH NEVER wraps — saves ~8 cycles on every match byte.
 ;
 ; Bank header: 1 byte (delta_acc). Source starts at $4001.
-; PORTB AND #$FE keeps OS ROM off -> no SEI needed for bank switch.
+; portb_table entries have bit 0 clear (OS ROM off) -> no SEI needed for bank switch.
 ;
 ; Mode dispatch via LSR:
-;   mode 0: LSR -> A=0,C=0 -> fall to JMP @need_token
+;   mode 0: LSR -> A=0,C=0 -> BEQ @go_token (once per token)
 ;   mode 1: LSR -> A=0,C=1 -> BCS @literal_byte (hot path)
-;   mode 2: LSR -> A=1,C=0 -> BNE @go_match
+;   mode 2: LSR -> A=1,C=0 -> fall to JMP @match_byte (per match byte)
 ;
 ; Requires: config.asm (N_BANKS, POKEY_CHANNELS)
 ;           audc_tables.asm, zeropage_lz.inc
@@ -38,6 +38,12 @@ BUF_END_HI   = >LZ_BUF_END
 .if POKEY_CHANNELS > 4
     .error "POKEY_CHANNELS must be 1-4"
 .endif
+.if BUF_START_HI <> $80
+    .error "DST wrap mask assumes LZ buffer at $8000-$BFFF"
+.endif
+.if BUF_END_HI <> $C0
+    .error "DST wrap mask assumes LZ buffer at $8000-$BFFF"
+.endif
 
 ; ------------------------------------------------------------------
 ; IRQ Entry
@@ -56,9 +62,9 @@ irq_handler:
     beq irq_exit
 
 ; ==================================================================
-; FIXED-TIMING OUTPUT: cached sample → AUDC via LUT
+; FIXED-TIMING OUTPUT: last decoded sample → AUDC via LUT
 ; ==================================================================
-    ldx ZP_CACHED
+    ldx ZP_DELTA_ACC             ; accumulator doubles as output cache
 
 .if POKEY_CHANNELS >= 1
     lda audc1_tab,x
@@ -84,10 +90,10 @@ irq_handler:
     lda ZP_LZ_MODE
     lsr
     bcs @literal_byte            ; mode 1 (hot path)
-    bne @go_match                ; mode 2
-    jmp @need_token              ; mode 0
-@go_match:
-    jmp @match_byte
+    beq @go_token                ; mode 0
+    jmp @match_byte              ; mode 2
+@go_token:
+    jmp @need_token
 
 ; --- MODE 1: Literal (fast path, falls through to @output) ---
 @literal_byte:
@@ -98,21 +104,18 @@ irq_handler:
     bne @output
     inc ZP_LZ_SRC+1
 
-; --- Common output: delta accumulate + cache ---
+; --- Common output: delta accumulate (played by next IRQ) ---
 @output:
     clc
     adc ZP_DELTA_ACC
     sta ZP_DELTA_ACC
-    sta ZP_CACHED                ; cache for next IRQ
 
     ; Advance ZP_LZ_DST (circular buffer wrap)
     inc ZP_LZ_DST
     bne @dst_ok
     inc ZP_LZ_DST+1
-    lda ZP_LZ_DST+1
-    cmp #BUF_END_HI
-    bcc @dst_ok
-    lda #BUF_START_HI            ; wrap $C000 -> $8000
+    lda ZP_LZ_DST+1              ; hi is $81-$C0 here; clearing
+    and #$BF                     ; bit 6 wraps $C0 -> $80 branchless
     sta ZP_LZ_DST+1
 @dst_ok:
     dec ZP_LZ_COUNT
@@ -228,11 +231,10 @@ irq_exit:
 
     ; Bank in to read header of new bank
     ldx ZP_BANK_IDX
-    lda portb_table,x
-    and #$FE                     ; keep OS ROM off
+    lda portb_table,x            ; OS ROM bit pre-cleared
     sta PORTB
     lda BANK_BASE                ; 1-byte header = new delta_acc
-    sta ZP_DELTA_ACC
+    sta ZP_DELTA_ACC             ; (equals last sample: no audible step)
 
     ; Source at $4001 (past header)
     lda #$01
@@ -27,6 +27,7 @@ play_init:
     ldx #0
 @copy_portb:
     lda TAB_MEM_BANKS+1,x
+    and #$FE                    ; keep OS ROM off while banked in
     sta portb_table,x
     inx
     cpx #N_BANKS
@@ -55,7 +56,6 @@ main_loop:
 init_first_bank:
     ; Bank in to read header
     lda portb_table              ; bank 0 = first entry
-    and #$FE                     ; keep OS ROM off
     sta PORTB
     lda BANK_BASE                ; 1-byte header = initial delta_acc
     sta ZP_DELTA_ACC
@@ -78,10 +78,6 @@ init_first_bank:
     sta ZP_LZ_COUNT
     sta ZP_BANK_IDX
 
-    ; Prime cached sample: first output = delta_acc value
-    lda ZP_DELTA_ACC
-    sta ZP_CACHED
-
     ; Mark as playing
     lda #$FF
     sta ZP_PLAYING
@@ -26,6 +26,7 @@ play_init:
     ldx #0
 @copy_portb:
     lda TAB_MEM_BANKS+1,x
+    and #$FE                    ; keep OS ROM off while banked in
     sta portb_table,x
     inx
     cpx #N_BANKS
@@ -124,11 +124,9 @@ show_splash:
 ; WAIT FOR SPACE KEY
 ; ==========================================================================
 wait_loop:
-    lda SKSTAT
-    and #$04
+    jsr poll_key
     bne wait_loop
-    lda SKSTAT                  ; Double-read debounce
-    and #$04
+    jsr poll_key                ; Double-read debounce
     bne wait_loop
 
     lda KBCODE
@@ -137,21 +135,17 @@ wait_loop:
     beq got_space
 
 wait_release:
-    lda SKSTAT
-    and #$04
+    jsr poll_key
     beq wait_release
-    lda SKSTAT
-    and #$04
+    jsr poll_key
     beq wait_release
     jmp wait_loop
 
 got_space:
 space_release:
-    lda SKSTAT
-    and #$04
+    jsr poll_key
     beq space_release
-    lda SKSTAT
-    and #$04
+    jsr poll_key
     beq space_release
 
     ; --- Transition to playback ---
@@ -161,6 +155,12 @@ space_release:
     sta NMIEN
     jmp play_init
 
+; --- Key state: Z set while a key is held (SKSTAT bit 2 low) ---
+poll_key:
+    lda SKSTAT
+    and #$04
+    rts
+
 ; ==========================================================================
 ; NMI HANDLER
 ; ==========================================================================
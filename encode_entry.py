@@ -9,4 +9,10 @@ if getattr(sys, 'frozen', False):
     os.chdir(os.path.dirname(sys.executable))
 
 from stream_player.cli import main
-sys.exit(main())
+
+if __name__ == '__main__':
+    # -j workers are spawned processes; in the frozen executable they
+    # re-enter this script and must run the worker, not the CLI.
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -9,8 +9,11 @@ The project is also compatible with the external MADS assembler:
     mads stream_player.asm -o:output.xex
 """
 
+import functools
+import hashlib
 import os
 import shutil
+import struct
 import sys
 
 from .tables import index_to_volumes, max_level
@@ -45,6 +48,16 @@ MODE_VQ = 2
 
 BANK_BASE = 0x4000
 
+# Loader addresses used by banks.asm (must match atari.inc)
+STUB_ADDR = 0x0600
+PORTB = 0xD301
+PORTB_MAIN = 0xFE
+RUNAD = 0x02E0
+INITAD = 0x02E2
+
+# '$00'..'$FF', for .byte lists
+_HEX_BYTES = tuple(f'${v:02X}' for v in range(256))
+
 
 def _normalize_asm_dir():
     """Find the asm/ directory, trying multiple locations.
@@ -81,7 +94,8 @@ def _normalize_asm_dir():
 
 def generate_project(output_dir, banks, compress_mode, divisor, audctl,
                      actual_rate, pokey_channels=2, vec_size=4,
-                     source_name='', duration=0.0, stereo=False):
+                     source_name='', duration=0.0, stereo=False,
+                     bank_sources=True):
     """Generate complete assembly project.
 
     Args:
@@ -96,6 +110,9 @@ def generate_project(output_dir, banks, compress_mode, divisor, audctl,
         source_name: Original audio filename (for comments)
         duration: Audio duration in seconds
         stereo: True for dual-POKEY stereo
+        bank_sources: Write bank_XX.asm data files.  When False, banks.asm
+            is left empty and the caller appends the bank segments to the
+            assembled player with write_xex_with_banks().
 
     Returns:
         Path to master stream_player.asm file.
@@ -121,11 +138,12 @@ def generate_project(output_dir, banks, compress_mode, divisor, audctl,
     _write_portb_table(output_dir)
     _write_splash_data(output_dir, pokey_channels, actual_rate,
                        compress_mode, vec_size, n_banks)
-    _write_banks_asm(output_dir, n_banks)
 
-    # 3. Write bank data files
-    for i, bank_data in enumerate(banks):
-        _write_bank_data(output_dir, i, bank_data)
+    # 3. Write bank loader stubs + bank data files
+    if bank_sources:
+        write_bank_sources(output_dir, banks)
+    else:
+        _write_banks_asm(output_dir, 0)
 
     # 4. VQ-specific tables
     if compress_mode == 'vq':
@@ -186,6 +204,14 @@ def _write_config(output_dir, n_banks, mode_int, divisor, audctl,
 
 def _write_audc_tables(output_dir, pokey_channels):
     """Write AUDC lookup tables (index → AUDC register value)."""
+    path = os.path.join(output_dir, 'audc_tables.asm')
+    with open(path, 'w', newline='\n') as f:
+        f.write(_audc_tables_source(pokey_channels))
+
+
+@functools.lru_cache(maxsize=4)
+def _audc_tables_source(pokey_channels):
+    """audc_tables.asm text; fixed for a given channel count."""
     max_lvl = max_level(pokey_channels)
 
     lines = [
@@ -197,22 +223,18 @@ def _write_audc_tables(output_dir, pokey_channels):
         '',
     ]
 
+    vols_by_idx = [index_to_volumes(idx, pokey_channels)
+                   for idx in range(max_lvl + 1)]
     for ch in range(pokey_channels):
         lines.append(f'audc{ch+1}_tab:')
-        tab = []
-        for idx in range(max_lvl + 1):
-            vols = index_to_volumes(idx, pokey_channels)
-            tab.append(vols[ch] | 0x10)
         # Pad to 256 entries
-        tab += [0x10] * (256 - len(tab))
+        tab = bytes(v[ch] | 0x10 for v in vols_by_idx).ljust(256, b'\x10')
         for i in range(0, 256, 16):
             vals = ','.join(f'${v:02X}' for v in tab[i:i+16])
             lines.append(f'    .byte {vals}')
         lines.append('')
 
-    path = os.path.join(output_dir, 'audc_tables.asm')
-    with open(path, 'w', newline='\n') as f:
-        f.write('\n'.join(lines) + '\n')
+    return '\n'.join(lines) + '\n'
 
 
 def _write_portb_table(output_dir):
@@ -225,9 +247,8 @@ def _write_portb_table(output_dir):
         '',
         'portb_table:',
     ]
-    for i in range(0, 64, 16):
-        vals = ','.join(['$FE'] * 16)
-        lines.append(f'    .byte {vals}')
+    # 64 entries, 16 per row
+    lines += ['    .byte ' + ','.join(['$FE'] * 16)] * 4
 
     path = os.path.join(output_dir, 'portb_table.asm')
     with open(path, 'w', newline='\n') as f:
@@ -246,16 +267,15 @@ def _write_vq_tables(output_dir, vec_size):
         '',
         'vq_lo_tab:',
     ]
-    for i in range(0, 256, 16):
-        vals = ','.join(f'${(BANK_BASE + j * vec_size) & 0xFF:02X}'
-                        for j in range(i, i + 16))
-        lines.append(f'    .byte {vals}')
+    addrs = range(BANK_BASE, BANK_BASE + 256 * vec_size, vec_size)
+    lo = bytes(a & 0xFF for a in addrs)
+    hi = bytes((a >> 8) & 0xFF for a in addrs)
+    lines += ['    .byte ' + ','.join(map(_HEX_BYTES.__getitem__, lo[i:i+16]))
+              for i in range(0, 256, 16)]
 
     lines.extend(['', 'vq_hi_tab:'])
-    for i in range(0, 256, 16):
-        vals = ','.join(f'${((BANK_BASE + j * vec_size) >> 8) & 0xFF:02X}'
-                        for j in range(i, i + 16))
-        lines.append(f'    .byte {vals}')
+    lines += ['    .byte ' + ','.join(map(_HEX_BYTES.__getitem__, hi[i:i+16]))
+              for i in range(0, 256, 16)]
 
     path = os.path.join(output_dir, 'vq_tables.asm')
     with open(path, 'w', newline='\n') as f:
@@ -273,34 +293,33 @@ def _write_splash_data(output_dir, pokey_channels, actual_rate,
     err_title = "STREAM PLAYER".center(40)
     err_msg = f"ERROR: {ram_kb}KB MEMORY REQUIRED".center(40)
 
-    def _fmt_codes(label, text):
-        codes = to_screen_codes(text)
-        result = [f'{label}:']
-        for i in range(0, 40, 8):
-            vals = ','.join(f'${c:02X}' for c in codes[i:i+8])
-            result.append(f'    .byte {vals}')
-        return result
-
     lines = [
         '; ==========================================================================',
         '; splash_data.asm -- Splash screen text (generated)',
         '; ==========================================================================',
         '; 40 bytes per line, ANTIC Mode 2 screen codes.',
-        '',
     ]
-    lines.extend(_fmt_codes('text_line1', line1))
-    lines.append('')
-    lines.extend(_fmt_codes('text_line2', line2))
-    lines.append('')
-    lines.extend(_fmt_codes('text_err_title', err_title))
-    lines.append('')
-    lines.extend(_fmt_codes('text_err_msg', err_msg))
+    for label, text in (('text_line1', line1), ('text_line2', line2),
+                        ('text_err_title', err_title),
+                        ('text_err_msg', err_msg)):
+        codes = to_screen_codes(text)
+        lines += ['', f'{label}:']
+        lines += ['    .byte ' + ','.join(map(_HEX_BYTES.__getitem__,
+                                                codes[i:i+8]))
+                  for i in range(0, 40, 8)]
 
     path = os.path.join(output_dir, 'splash_data.asm')
     with open(path, 'w', newline='\n') as f:
         f.write('\n'.join(lines) + '\n')
 
 
+def write_bank_sources(output_dir, banks):
+    """Write banks.asm and one bank_XX.asm data file per bank."""
+    _write_banks_asm(output_dir, len(banks))
+    for i, bank_data in enumerate(banks):
+        _write_bank_data(output_dir, i, bank_data)
+
+
 def _write_bank_data(output_dir, bank_idx, data):
     """Write one bank's data as .byte directives."""
     lines = [
@@ -312,10 +331,9 @@ def _write_bank_data(output_dir, bank_idx, data):
         f'    org BANK_BASE',
         '',
     ]
-    for i in range(0, len(data), 16):
-        chunk = data[i:i+16]
-        vals = ','.join(f'${b:02X}' for b in chunk)
-        lines.append(f'    .byte {vals}')
+    hex_bytes = _HEX_BYTES.__getitem__
+    lines += ['    .byte ' + ','.join(map(hex_bytes, data[i:i+16]))
+              for i in range(0, len(data), 16)]
 
     path = os.path.join(output_dir, f'bank_{bank_idx:02d}.asm')
     with open(path, 'w', newline='\n') as f:
@@ -433,10 +451,139 @@ def try_assemble(output_dir):
     from .simple_mads import assemble as builtin_assemble
     from .simple_mads.assembler import AsmError
 
+    key = _project_digest(output_dir)
+    xex = _ASSEMBLED.get(key)
+    if xex is None:
+        try:
+            xex = builtin_assemble(asm_path)
+        except AsmError as e:
+            return None, f"Assembly failed: {e}"
+        if len(_ASSEMBLED) >= _ASSEMBLED_MAX:
+            del _ASSEMBLED[next(iter(_ASSEMBLED))]  # oldest first
+        _ASSEMBLED[key] = xex
+    with open(xex_path, 'wb') as f:
+        f.write(xex)
+    return xex_path, 'built-in'
+
+
+# Built-in assembler output by project source digest.  Repeated builds
+# in one process (server mode, sweeps) mostly share the player sources.
+_ASSEMBLED = {}
+_ASSEMBLED_MAX = 8
+
+
+def _project_digest(output_dir):
+    """Digest of every .asm/.inc file in the project (names + contents)."""
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith(('.asm', '.inc')):
+            with open(os.path.join(output_dir, name), 'rb') as f:
+                data = f.read()
+            h.update(f'{name}\0{len(data)}\0'.encode())
+            h.update(data)
+    return h.digest()
+
+
+# ══════════════════════════════════════════════════════════════════════
+# Direct bank segment output
+# ══════════════════════════════════════════════════════════════════════
+
+def _xex_segment_header(start, length):
+    """$FFFF + start/end address header for one XEX segment."""
+    return struct.pack('<HHH', 0xFFFF, start, start + length - 1)
+
+
+def _bank_segments(banks):
+    """XEX chunks equivalent to assembling banks.asm + bank_XX.asm.
+
+    Per bank: INI stub that banks in, the raw bank data at BANK_BASE,
+    then an INI stub that restores main RAM.
+    """
+    init = _xex_segment_header(INITAD, 2) + struct.pack('<H', STUB_ADDR)
+    bank_out = bytes([0xA9, PORTB_MAIN,                       # lda #PORTB_MAIN
+                      0x8D, PORTB & 0xFF, PORTB >> 8,         # sta PORTB
+                      0x60])                                  # rts
+    out_seg = _xex_segment_header(STUB_ADDR, len(bank_out)) + bank_out
+
+    for i, data in enumerate(banks):
+        src = TAB_MEM_BANKS + i + 1
+        bank_in = bytes([0xAD, src & 0xFF, src >> 8,          # lda TAB_MEM_BANKS+i+1
+                         0x8D, PORTB & 0xFF, PORTB >> 8,      # sta PORTB
+                         0x60])                               # rts
+        yield _xex_segment_header(STUB_ADDR, len(bank_in)) + bank_in
+        yield init
+        if len(data):
+            yield _xex_segment_header(BANK_BASE, len(data))
+            yield memoryview(data)
+        yield out_seg
+        yield init
+
+
+def _runad_offset(xex):
+    """Byte offset of the RUNAD segment in an XEX image (or its length)."""
+    pos = 0
+    runad = len(xex)
+    while pos + 4 <= len(xex):
+        seg_pos = pos
+        if xex[pos:pos + 2] == b'\xFF\xFF':
+            pos += 2
+        start, end = struct.unpack_from('<HH', xex, pos)
+        pos += 4 + (end - start + 1)
+        if start == RUNAD:
+            runad = seg_pos
+    return runad
+
+
+def _write_chunks(path, chunks):
+    """Write all chunks to path, vectored where the OS supports it.
+
+    Returns:
+        Number of bytes written.
+    """
+    views = [memoryview(c) for c in chunks if len(c)]
+    total = sum(v.nbytes for v in views)
+    if not hasattr(os, 'writev'):
+        with open(path, 'wb', buffering=1 << 20) as f:
+            for view in views:
+                f.write(view)
+        return total
+
+    iov_max = 1024
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
     try:
-        xex_data = builtin_assemble(asm_path)
-        with open(xex_path, 'wb') as f:
-            f.write(xex_data)
-        return xex_path, 'built-in'
-    except AsmError as e:
-        return None, f"Assembly failed: {e}"
+        i = 0
+        while i < len(views):
+            n = os.writev(fd, views[i:i + iov_max])
+            # Skip fully-written buffers; trim a partially-written one
+            while i < len(views) and n >= len(views[i]):
+                n -= len(views[i])
+                i += 1
+            if n:
+                views[i] = views[i][n:]
+    finally:
+        os.close(fd)
+    return total
+
+
+def write_xex_with_banks(player_xex, banks, xex_path):
+    """Splice bank segments into an assembled player XEX.
+
+    The player must have been generated with ``bank_sources=False``.
+    Bank segments are inserted before the RUNAD segment, giving the same
+    file the assembler would produce from the full project — without
+    rendering and re-parsing every bank as ``.byte`` source.
+
+    Args:
+        player_xex: Path to the assembled player-only XEX.
+        banks: List of bank data (bytes), each up to 16384 bytes.
+        xex_path: Output XEX path.
+
+    Returns:
+        Size of the written XEX in bytes.
+    """
+    with open(player_xex, 'rb') as f:
+        player = f.read()
+    split = _runad_offset(player)
+    head = memoryview(player)[:split]
+    tail = memoryview(player)[split:]
+    return _write_chunks(xex_path, [head, *_bank_segments(banks), tail])
@@ -15,34 +15,137 @@ Pipeline:
 """
 
 import argparse
+import functools
+import io
 import os
+import shlex
 import shutil
 import sys
 import tempfile
 import time
 
+from . import __version__
 from .errors import StreamPlayerError, AudioLoadError, CompressionError
-from .audio import (load_audio, resample, encode_audio, encode_indices,
-                    find_best_divisor)
-from .compress import compress_banks, decompress_bank
 from .layout import split_into_banks, MAX_BANKS
-from .tables import max_level
-from .asm_project import generate_project, try_assemble
 
+# Everything else the pipeline needs (numpy/scipy-backed modules, the
+# compressor, thread pools, hashing) is imported where used so --help and
+# argument errors return immediately.
 
+
+# Status lines are collected here and written in one go at stage
+# boundaries; \r progress updates bypass it (see _write_progress).
+_pending_output = io.StringIO()
+
+
+def _say(text=''):
+    """Queue a status line for the next _flush_output()."""
+    _pending_output.write(text)
+    _pending_output.write('\n')
+
+
+def _flush_output():
+    """Write queued status lines to stdout."""
+    text = _pending_output.getvalue()
+    if text:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        _pending_output.seek(0)
+        _pending_output.truncate()
+
+
+@functools.lru_cache(maxsize=64)
 def _fmt_duration(seconds: float) -> str:
     """Format seconds as m:ss or h:mm:ss."""
-    s = int(seconds)
-    if s >= 3600:
-        return f"{s // 3600}:{(s % 3600) // 60:02d}:{s % 60:02d}"
-    return f"{s // 60}:{s % 60:02d}"
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}:{m:02d}:{s:02d}"
+    return f"{m}:{s:02d}"
+
+
+# Progress lines are pre-encoded UTF-8 written straight to the binary
+# stdout buffer, skipping the text layer; each bar cell is 3 bytes.
+_BAR_WIDTH = 30
+# Every possible bar, rendered once: index by the number of filled cells
+_BARS = tuple(('\u2588' * n + '\u2591' * (_BAR_WIDTH - n)).encode()
+              for n in range(_BAR_WIDTH + 1))
+
+
+def _progress_bar(filled):
+    """Progress bar bytes with `filled` of _BAR_WIDTH cells set."""
+    return _BARS[filled]
+
+
+def _write_progress(msg):
+    """Redraw the progress line (bytes, starting with \\r) on a terminal."""
+    if sys.stdout.isatty():
+        sys.stdout.buffer.write(msg)
+        sys.stdout.buffer.flush()
+
+
+def _end_progress():
+    """Terminate the progress line, if one was drawn."""
+    if sys.stdout.isatty():
+        _say()
+
 
+_PROGRESS_INTERVAL = 0.05  # seconds between redraws (final update always drawn)
 
-def _compress_progress(comp_size, n_samples, n_banks):
-    """Progress callback for DeltaLZ compression."""
+
+def _throttled(draw):
+    """Wrap draw(done, total, *extra) to redraw at most every
+    _PROGRESS_INTERVAL seconds.
+
+    Encoders call progress callbacks from their inner loops; skipped calls
+    cost one clock read and no formatting.  The final call (done >= total)
+    is always drawn.
+    """
+    last_t = 0.0
+
+    def progress(done, total, *extra):
+        nonlocal last_t
+        now = time.monotonic()
+        if done < total and now - last_t < _PROGRESS_INTERVAL:
+            return
+        last_t = now
+        draw(done, total, *extra)
+
+    return progress
+
+
+def _draw_compress_progress(comp_size, n_samples, n_banks):
+    """Progress line for DeltaLZ compression."""
     if n_banks > 0:
-        print(f"\r  {n_banks} banks, {comp_size:,} bytes, "
-              f"{n_samples:,} samples", end='', flush=True)
+        _write_progress(f"\r  {n_banks} banks, {comp_size:,} bytes, "
+                        f"{n_samples:,} samples".encode())
+
+
+def _verify_decompress(compressed_banks, expected, use_delta):
+    """Decompress all banks and compare against the source indices.
+
+    Each bank is compared against a memoryview slice of expected as it
+    is produced, stopping at the first mismatch; the decoded stream is
+    never held in full.
+
+    Returns:
+        Number of samples verified.
+    """
+    from .compress import decompress_bank
+    expected = memoryview(expected)
+    off = 0
+    for i, bank_data in enumerate(compressed_banks):
+        chunk = decompress_bank(bank_data, use_delta)
+        n = len(chunk)
+        if expected[off:off + n] != chunk:
+            raise CompressionError(
+                f"Verification failed in bank {i} "
+                f"(samples {off:,}-{off + n:,})")
+        off += n
+    if off != len(expected):
+        raise CompressionError(
+            f"Verification failed: expected {len(expected)}, got {off}")
+    return off
 
 
 def main(argv=None):
@@ -59,9 +162,10 @@ def main(argv=None):
   encode song.mp3 -g 0              VQ with noise gate disabled
   encode song.mp3 -g 20             VQ with stronger noise gate
   encode song.mp3 -a                ASM project only (no XEX)
-  encode song.mp3 -x -a             Both XEX and ASM project""")
+  encode song.mp3 -x -a             Both XEX and ASM project
+  encode --server -c lz < jobs.txt  Batch: one "input [options]" per line""")
 
-    parser.add_argument('input',
+    parser.add_argument('input', nargs='?',
                         help='Input audio file (WAV, MP3, FLAC, OGG, MOD, ...)')
 
     # Output targets: default = XEX only; -a = ASM only; -x -a = both
@@ -74,7 +178,7 @@ def main(argv=None):
                         help='Output base name (default: outputs/<input>, adds .xex / _asm)')
 
     # Compression
-    parser.add_argument('-c', '--compression', choices=['off', 'lz', 'vq'], default='vq',
+    parser.add_argument('-c', '--compression', choices=list(_PROJECT_MODES), default='vq',
                         help='Compression: vq (default), lz (DeltaLZ), off (raw)')
     parser.add_argument('-s', '--vec-size', type=int, choices=[2, 4, 8, 16], default=4,
                         help='VQ vector size (default: 4). Smaller = better quality, less compression')
@@ -95,17 +199,86 @@ def main(argv=None):
     # Advanced
     parser.add_argument('-b', '--max-banks', type=int, default=MAX_BANKS,
                         help=f'Max extended memory banks (default: {MAX_BANKS})')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='Worker processes for VQ training and LZ packing '
+                             '(default: 1, 0 = all cores). Parallel LZ packing '
+                             'may leave a partly filled bank between segments')
     parser.add_argument('--no-noise-shaping', action='store_true',
                         help='Disable noise shaping (slightly faster, lower quality)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-encode; do not read or write the encoding cache')
+    parser.add_argument('--cache-dir', default=_default_cache_dir(),
+                        metavar='DIR',
+                        help='Directory for cached encodings (default: ~/.cache/stream_player)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Show compression verification details')
+    parser.add_argument('--server', action='store_true',
+                        help='Batch mode: read one "input [options]" line per '
+                             'job from stdin; other options given here are '
+                             'defaults for every job')
 
+    if argv is None:
+        argv = sys.argv[1:]
     args = parser.parse_args(argv)
 
+    if args.server:
+        if args.input:
+            parser.error("--server reads inputs from stdin")
+        defaults = [a for a in argv if a != '--server']
+        return _serve(parser, defaults, sys.stdin)
+    return _run_job(parser, args)
+
+
+def _serve(parser, defaults, lines):
+    """Run one job per argument line (--server).
+
+    The parser, imported modules and memoized tables persist across
+    jobs, so only the first job pays the startup cost.  A failing job
+    is reported and the loop moves on.
+
+    Returns:
+        0 if every job succeeded, otherwise the last non-zero status.
+    """
+    status = 0
+    for line in lines:
+        try:
+            job_argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Error: {e}: {line.strip()}", file=sys.stderr)
+            status = 1
+            continue
+        if not job_argv:
+            continue
+        try:
+            code = _run_job(parser, parser.parse_args(defaults + job_argv))
+        except SystemExit as e:
+            # argparse has already reported the problem (or printed --help)
+            code = e.code if isinstance(e.code, int) else 0
+        if code == 130:
+            return code
+        if code:
+            status = code
+    return status
+
+
+def _run_job(parser, args):
+    """Validate parsed arguments and run the pipeline.
+
+    Returns:
+        Process exit status.
+    """
+    if not args.input:
+        parser.error("the following arguments are required: input")
+
     # Output logic: no flags → XEX; -a alone → ASM only; -x -a → both
     if not args.xex and not args.asm:
         args.xex = True
 
+    if args.jobs < 0:
+        parser.error(f"--jobs must be >= 0, got {args.jobs}")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+
     # Validate gate range
     if not 0 <= args.gate <= 100:
         parser.error(f"--gate must be 0-100, got {args.gate}")
@@ -113,12 +286,15 @@ def main(argv=None):
     try:
         return run(args)
     except StreamPlayerError as e:
+        _flush_output()
         print(f"\nError: {e}", file=sys.stderr)
         return 1
     except KeyboardInterrupt:
+        _flush_output()
         print("\nAborted.", file=sys.stderr)
         return 130
     except Exception as e:
+        _flush_output()
         print(f"\nUnexpected error: {type(e).__name__}: {e}", file=sys.stderr)
         if args.verbose:
             import traceback
@@ -126,6 +302,9 @@ def main(argv=None):
         return 2
 
 
+_PROJECT_MODES = {'off': 'raw', 'lz': 'lz', 'vq': 'vq'}
+
+
 def _derive_paths(args):
     """Derive XEX and ASM output paths from args.
 
@@ -151,9 +330,28 @@ def _derive_paths(args):
 
 def run(args) -> int:
     """Execute the conversion pipeline."""
+    from concurrent.futures import ThreadPoolExecutor
+    from .audio import load_audio, resample, find_best_divisor
     t0 = time.time()
 
+    # A cached source description means the decode may not be needed at
+    # all: every encoding can come from the cache.  Otherwise decode in
+    # the background; the divisor search and path setup below do not
+    # depend on the audio.
+    cache_dir = None if args.no_cache else args.cache_dir
+    source_path = source_info = None
+    if cache_dir:
+        source_path = _source_cache_path(cache_dir, args.input)
+    if source_path:
+        source_info = _read_source_info(source_path)
+    load_future = None
+    if source_info is None:
+        pool = ThreadPoolExecutor(max_workers=1)
+        load_future = pool.submit(load_audio, args.input)
+        pool.shutdown(wait=False)
+
     xex_path, asm_path = _derive_paths(args)
+    divisor, actual_rate, audctl = find_best_divisor(args.rate)
 
     # Show what we'll generate
     targets = []
@@ -161,114 +359,141 @@ def run(args) -> int:
         targets.append(os.path.basename(xex_path))
     if asm_path:
         targets.append(asm_path + '/')
-    print(f"Output: {', '.join(targets)}")
+    _say(f"Output: {', '.join(targets)}")
 
     # ── 1. Load audio ──
-    print(f"\nLoading: {args.input}")
-    audio, src_rate, n_channels = load_audio(args.input)
+    _say(f"\nLoading: {args.input}")
+    _flush_output()
+    if load_future is not None:
+        audio, src_rate, n_channels = load_future.result()
+        n_samples = audio.shape[0]
+        if source_path:
+            _write_source_info(source_path, src_rate, n_channels, n_samples)
+    else:
+        audio = None  # decoded on demand by encode() if the cache misses
+        src_rate, n_channels, n_samples = source_info
 
-    n_samples = audio.shape[0]
     input_duration = n_samples / src_rate
     ch_str = f"{n_channels} channel{'s' if n_channels > 1 else ''}"
-    print(f"  Format: {src_rate} Hz, {ch_str}")
-    print(f"  Duration: {_fmt_duration(input_duration)} ({n_samples:,} samples)")
+    _say(f"  Format: {src_rate} Hz, {ch_str}")
+    _say(f"  Duration: {_fmt_duration(input_duration)} ({n_samples:,} samples)")
 
     if input_duration < 0.1:
         raise AudioLoadError("Audio too short (< 0.1 seconds)")
 
-    # ── 2. Find POKEY divisor ──
-    divisor, actual_rate, audctl = find_best_divisor(args.rate)
+    # ── 2. POKEY divisor (computed above, during load) ──
     clk_name = "1.77MHz" if (audctl & 0x40) else "64kHz"
-    print(f"\nPOKEY timer:")
-    print(f"  Requested: {args.rate} Hz \u2192 divisor ${divisor:02X}, AUDCTL=${audctl:02X} ({clk_name})")
-    print(f"  Actual: {actual_rate:.1f} Hz")
-
-    # ── 3. Resample ──
-    if abs(src_rate - actual_rate) / actual_rate > 0.001:
-        print(f"\nResampling {src_rate} Hz \u2192 {actual_rate:.0f} Hz...")
-        audio_rs = resample(audio, src_rate, int(actual_rate))
-        print(f"  Output: {audio_rs.shape[0]:,} samples")
-    else:
-        audio_rs = audio
-        print(f"\n  Sample rate matches, no resampling needed.")
+    _say(f"\nPOKEY timer:")
+    _say(f"  Requested: {args.rate} Hz \u2192 divisor ${divisor:02X}, AUDCTL=${audctl:02X} ({clk_name})")
+    _say(f"  Actual: {actual_rate:.1f} Hz")
+
+    # ── 3. Resample + encode (on cache miss) ──
+    def encode(encode_fn, **kwargs):
+        """Return encode_fn(resampled audio, ...), reusing a cached result."""
+        nonlocal audio
+        cache_path = None
+        if cache_dir:
+            cache_path = _indices_cache_path(
+                cache_dir, args.input, actual_rate, encode_fn.__name__, kwargs)
+        if cache_path:
+            cached = _read_indices_cache(cache_path)
+            if cached is not None:
+                _say(f"  Reusing cached encoding ({os.path.basename(cache_path)})")
+                return cached
+
+        if audio is None:
+            audio = load_audio(args.input)[0]
+        if abs(src_rate - actual_rate) / actual_rate > 0.001:
+            _say(f"  Resampling {src_rate} Hz \u2192 {actual_rate:.0f} Hz...")
+            _flush_output()
+            audio_rs = resample(audio, src_rate, int(actual_rate))
+            _say(f"  Resampled: {audio_rs.shape[0]:,} samples")
+        else:
+            audio_rs = audio
+            _say(f"  Sample rate matches, no resampling needed.")
+        audio = None  # source-rate copy is the largest buffer; drop it now
+        _flush_output()
+
+        data = encode_fn(audio_rs, n_channels, False, **kwargs)
+        if cache_path:
+            _write_indices_cache(cache_path, data)
+        return data
 
     # ── 4. Encode to POKEY format ──
     noise_shaping = not args.no_noise_shaping
     bytes_per_sec = actual_rate
-    compress_mode = args.compression  # 'vq', 'lz', or 'off'
+    # CLI name -> generate_project() mode ('off' is the player's 'raw')
+    compress_mode = _PROJECT_MODES[args.compression]
+    vec_size = args.vec_size if compress_mode == 'vq' else 4
+    pending_checks = []  # background verifications, collected before output
 
     if compress_mode == 'vq':
         banks, encoded_duration, truncated, mode_label = \
-            _encode_vq(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
+            _encode_vq(args, encode, actual_rate, bytes_per_sec,
                        input_duration)
-        vec_size = args.vec_size
-
     elif compress_mode == 'lz':
         banks, encoded_duration, truncated, mode_label = \
-            _encode_lz(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
-                       noise_shaping, input_duration)
-        vec_size = 4
-
+            _encode_lz(args, encode, actual_rate, bytes_per_sec,
+                       noise_shaping, input_duration, pending_checks)
     else:
         banks, encoded_duration, truncated, mode_label = \
-            _encode_raw(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
+            _encode_raw(args, encode, actual_rate, bytes_per_sec,
                         noise_shaping, input_duration)
-        vec_size = 4
-        compress_mode = 'raw'
+    del audio, encode
 
     # ── 5. Generate ASM project ──
-    source_name = os.path.basename(args.input)
-
-    if asm_path:
-        project_dir = asm_path
-    elif xex_path:
-        project_dir = tempfile.mkdtemp(prefix='stream_player_')
-    else:
+    if not asm_path and not xex_path:
+        _flush_output()
         return 0
 
-    print(f"\nGenerating assembly project ({mode_label}, {len(banks)} banks)...")
-    generate_project(
-        output_dir=project_dir,
+    project = dict(
         banks=banks,
         compress_mode=compress_mode,
         divisor=divisor,
         audctl=audctl,
         actual_rate=actual_rate,
         pokey_channels=args.channels,
-        vec_size=vec_size if compress_mode == 'vq' else 4,
-        source_name=source_name,
+        vec_size=vec_size,
+        source_name=os.path.basename(args.input),
         duration=encoded_duration,
         stereo=False,
     )
 
-    if asm_path:
-        n_files = len([f for f in os.listdir(project_dir)
-                       if f.endswith('.asm') or f.endswith('.inc')])
-        print(f"  {project_dir}/ ({n_files} source files)")
+    _say(f"\nGenerating assembly project ({mode_label}, {len(banks)} banks)...")
+    _flush_output()
+    asm_future = None
+    if asm_path and xex_path:
+        # Independent outputs: write the ASM project while the XEX builds
+        pool = ThreadPoolExecutor(max_workers=1)
+        asm_future = pool.submit(_build_asm_output, asm_path, project)
+        pool.shutdown(wait=False)
+    elif asm_path:
+        n_files = _build_asm_output(asm_path, project)
+        _say(f"  {asm_path}/ ({n_files} source files)")
 
     # ── 6. Assemble (if XEX requested) ──
-    if xex_path:
-        print(f"\nAssembling...")
-        assembled_xex, method = try_assemble(project_dir)
-
-        if assembled_xex:
-            shutil.copy2(assembled_xex, xex_path)
-            xex_kb = os.path.getsize(xex_path) / 1024
-            print(f"  {os.path.basename(xex_path)} ({xex_kb:.1f} KB) [{method}]")
-        else:
-            print(f"\n  Assembly failed: {method}", file=sys.stderr)
+    try:
+        if xex_path:
+            fallback_dir = None
             if not asm_path:
-                fallback_base = os.path.splitext(os.path.basename(args.input))[0]
+                fallback_base = os.path.splitext(
+                    os.path.basename(args.input))[0]
                 fallback_dir = os.path.join('outputs', fallback_base + '_asm')
-                os.makedirs('outputs', exist_ok=True)
-                if os.path.exists(fallback_dir):
-                    shutil.rmtree(fallback_dir)
-                shutil.copytree(project_dir, fallback_dir)
-                print(f"\n  ASM project saved to: {fallback_dir}/")
-
-    # Clean up temp dir if it was only for XEX
-    if not asm_path and xex_path:
-        shutil.rmtree(project_dir, ignore_errors=True)
+            _build_xex_output(xex_path, project, pending_checks, fallback_dir)
+        else:
+            _collect_checks(pending_checks)
+    except BaseException:
+        # Never return with the ASM writer still running (--server starts
+        # the next job at once), and report its failure too
+        if asm_future is not None and asm_future.exception() is not None:
+            _flush_output()
+            print(f"\nError writing {asm_path}/: {asm_future.exception()}",
+                  file=sys.stderr)
+        raise
+
+    if asm_future is not None:
+        n_files = asm_future.result()
+        _say(f"  {asm_path}/ ({n_files} source files)")
 
     # ── 7. Summary ──
     elapsed = time.time() - t0
@@ -285,27 +510,231 @@ def run(args) -> int:
     else:
         config = "1088KB (1MB expansion)"
 
-    print(f"\n{'=' * 50}")
-    print(f"  {mode_label}, {args.channels}ch, {actual_rate:.0f} Hz")
-    print(f"  {n} banks, {ram_kb}KB ({config})")
+    _say(f"\n{'=' * 50}")
+    _say(f"  {mode_label}, {args.channels}ch, {actual_rate:.0f} Hz")
+    _say(f"  {n} banks, {ram_kb}KB ({config})")
     if truncated:
-        print(f"  Encoded: {_fmt_duration(encoded_duration)} "
-              f"of {_fmt_duration(input_duration)} (truncated)")
+        _say(f"  Encoded: {_fmt_duration(encoded_duration)} "
+             f"of {_fmt_duration(input_duration)} (truncated)")
     else:
-        print(f"  Duration: {_fmt_duration(encoded_duration)}")
-    print(f"  Completed in {elapsed:.1f}s")
-    print(f"{'=' * 50}")
+        _say(f"  Duration: {_fmt_duration(encoded_duration)}")
+    _say(f"  Completed in {elapsed:.1f}s")
+    _say(f"{'=' * 50}")
+    _flush_output()
 
     return 0
 
 
+# ══════════════════════════════════════════════════════════════════════
+# Encoded-indices cache
+# ══════════════════════════════════════════════════════════════════════
+
+# Least recently used entries are evicted once the cache exceeds this.
+_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Encoder revision in every cache key.  Bump it whenever a change alters
+# the indices produced for the same input and settings (resample,
+# enhance_audio, encode_indices, the quantizers), so stale entries miss.
+_CACHE_FORMAT = 2
+
+
+def _default_cache_dir():
+    """Per-user cache directory ($XDG_CACHE_HOME or ~/.cache)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'stream_player')
+
+
+def _input_identity(input_path):
+    """Key prefix identifying one version of an input file.
+
+    Returns None if the file cannot be stat'ed; callers treat that as a
+    cache miss so load_audio() reports the problem.
+    """
+    try:
+        st = os.stat(input_path)
+    except OSError:
+        return None
+    return (f"{__version__}|{_CACHE_FORMAT}|{os.path.abspath(input_path)}|{st.st_size}|"
+            f"{st.st_mtime_ns}")
+
+
+def _cache_file(cache_dir, key, ext):
+    import hashlib
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f'sp_{digest}.{ext}')
+
+
+def _indices_cache_path(cache_dir, input_path, actual_rate, encode_name,
+                        kwargs):
+    """Cache file for one input file + encoder settings combination.
+
+    The key covers the input's identity (path, size, mtime), the encoder
+    and all of its settings, the package version and _CACHE_FORMAT.
+    Returns None if the input cannot be stat'ed.
+    """
+    identity = _input_identity(input_path)
+    if identity is None:
+        return None
+    settings = ','.join(f'{k}={kwargs[k]!r}' for k in sorted(kwargs))
+    key = (f"{identity}|{actual_rate!r}|{encode_name}|"
+           f"{settings}")
+    return _cache_file(cache_dir, key, 'idx')
+
+
+def _source_cache_path(cache_dir, input_path):
+    """Cache file describing the decoded input (rate, channels, length)."""
+    identity = _input_identity(input_path)
+    if identity is None:
+        return None
+    return _cache_file(cache_dir, identity, 'src')
+
+
+def _read_source_info(path):
+    """(src_rate, n_channels, n_samples) from the cache, or None."""
+    try:
+        with open(path) as f:
+            src_rate, n_channels, n_samples = (int(v) for v in f.read().split())
+    except (OSError, ValueError):
+        return None
+    return src_rate, n_channels, n_samples
+
+
+def _write_source_info(path, src_rate, n_channels, n_samples):
+    _write_indices_cache(path, f'{src_rate} {n_channels} {n_samples}\n'.encode())
+
+
+def _read_indices_cache(path):
+    """Cached index bytes, or None on a miss."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)  # mark as recently used for _prune_cache()
+    except OSError:
+        return None
+    return data
+
+
+def _write_indices_cache(path, data):
+    """Store index bytes; a failed write only costs the next run a re-encode."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return
+    _prune_cache(os.path.dirname(path), _CACHE_MAX_BYTES)
+
+
+def _prune_cache(cache_dir, max_bytes):
+    """Delete least recently used cache entries until under max_bytes."""
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for e in it:
+                if e.name.startswith('sp_') and e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, e.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+
+
+# ══════════════════════════════════════════════════════════════════════
+# Output builders
+# ══════════════════════════════════════════════════════════════════════
+
+def _collect_checks(pending_checks):
+    """Wait for background verifications; raises if any failed."""
+    for check in pending_checks:
+        n_verified = check.result()
+        _say(f"  Decompression verified ({n_verified:,} samples)")
+
+
+def _build_asm_output(asm_path, project):
+    """Write the full ASM project, bank sources included.
+
+    Returns:
+        Number of source files written.
+    """
+    from .asm_project import generate_project
+    generate_project(output_dir=asm_path, bank_sources=True, **project)
+    return len([f for f in os.listdir(asm_path)
+                if f.endswith('.asm') or f.endswith('.inc')])
+
+
+def _build_xex_output(xex_path, project, pending_checks, fallback_dir=None):
+    """Assemble the player alone and splice the bank data into the XEX.
+
+    Args:
+        xex_path: output .xex path
+        project: generate_project keyword arguments (banks included)
+        pending_checks: verification futures to collect before writing
+        fallback_dir: where to save the full ASM project if assembly
+            fails (None to skip)
+    """
+    from .asm_project import (generate_project, try_assemble,
+                              write_bank_sources, write_xex_with_banks)
+    banks = project['banks']
+    project_dir = tempfile.mkdtemp(prefix='stream_player_')
+    try:
+        generate_project(output_dir=project_dir, bank_sources=False,
+                         **project)
+        _say(f"\nAssembling...")
+        _flush_output()
+        assembled_xex, method = try_assemble(project_dir)
+        _collect_checks(pending_checks)
+
+        if assembled_xex:
+            xex_kb = write_xex_with_banks(assembled_xex, banks, xex_path) / 1024
+            _say(f"  {os.path.basename(xex_path)} ({xex_kb:.1f} KB) [{method}]")
+            return
+
+        _flush_output()
+        print(f"\n  Assembly failed: {method}", file=sys.stderr)
+        if fallback_dir:
+            os.makedirs(os.path.dirname(fallback_dir) or '.', exist_ok=True)
+            if os.path.exists(fallback_dir):
+                shutil.rmtree(fallback_dir)
+            write_bank_sources(project_dir, banks)
+            try:
+                shutil.copytree(project_dir, fallback_dir,
+                                copy_function=os.link)
+            except OSError:
+                # Cross-device (e.g. tmpfs → disk): plain copy
+                shutil.rmtree(fallback_dir, ignore_errors=True)
+                shutil.copytree(project_dir, fallback_dir)
+            _say(f"\n  ASM project saved to: {fallback_dir}/")
+    finally:
+        shutil.rmtree(project_dir, ignore_errors=True)
+
+
 # ══════════════════════════════════════════════════════════════════════
 # Encoding helpers
 # ══════════════════════════════════════════════════════════════════════
 
-def _encode_vq(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
-               input_duration):
-    """Encode audio with VQ compression."""
+def _encode_vq(args, encode, actual_rate, bytes_per_sec, input_duration):
+    """Encode audio with VQ compression.
+
+    encode(encode_fn, **kwargs) resamples the input and runs encode_fn,
+    or returns the cached result (see run).
+    """
+    from .audio import encode_indices
+    from .tables import max_level
     from .vq import vq_encode_banks
     vs = args.vec_size
 
@@ -314,28 +743,30 @@ def _encode_vq(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
         ns_label += '+enhanced'
     if args.gate > 0:
         ns_label += f'+gate{args.gate}%'
-    print(f"\nEncoding (mono, {args.channels}-channel, {ns_label})...")
-    indices = encode_indices(audio_rs, n_channels, False, False,
-                            sample_rate=int(actual_rate),
-                            pokey_channels=args.channels, mode='scalar',
-                            enhance=args.enhance)
-    print(f"  {len(indices):,} samples at {bytes_per_sec:,.0f} samples/sec")
-
-    print(f"\nVQ encoding (vec_size={vs}, 256 codes per bank)...")
-
+    _say(f"\nEncoding (mono, {args.channels}-channel, {ns_label})...")
+    _flush_output()
+    indices = encode(encode_indices, noise_shaping=False,
+                     sample_rate=int(actual_rate),
+                     pokey_channels=args.channels, mode='scalar',
+                     enhance=args.enhance)
+    _say(f"  {len(indices):,} samples at {bytes_per_sec:,.0f} samples/sec")
+
+    _say(f"\nVQ encoding (vec_size={vs}, 256 codes per bank)...")
+    _flush_output()
+
+    @_throttled
     def vq_progress(done, total, n_banks):
         pct = done / total if total else 1
-        bar_w = 30
-        filled = int(bar_w * pct)
-        bar = '\u2588' * filled + '\u2591' * (bar_w - filled)
-        print(f"\r  [{bar}] {pct*100:.1f}%  {done:,}/{total:,} samples, "
-              f"{n_banks} banks", end='', flush=True)
+        filled = int(_BAR_WIDTH * pct)
+        _write_progress(b"\r  [" + _progress_bar(filled) + (
+            f"] {pct*100:.1f}%  {done:,}/{total:,} samples, "
+            f"{n_banks} banks").encode())
 
     vq_banks, samples_compressed = vq_encode_banks(
         indices, vec_size=vs, max_banks=args.max_banks,
         max_level=max_level(args.channels), n_iter=20,
-        gate=args.gate, progress_fn=vq_progress)
-    print()
+        gate=args.gate, progress_fn=vq_progress, jobs=args.jobs)
+    _end_progress()
 
     encoded_duration = samples_compressed / bytes_per_sec
     truncated = samples_compressed < len(indices)
@@ -343,98 +774,106 @@ def _encode_vq(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
     if truncated:
         lost = len(indices) - samples_compressed
         lost_sec = lost / bytes_per_sec
-        print(f"  Filled {len(vq_banks)} banks ({args.max_banks} max), "
-              f"encoded {_fmt_duration(encoded_duration)} "
-              f"of {_fmt_duration(input_duration)}")
-        print(f"  Truncated {_fmt_duration(lost_sec)} "
-              f"({lost:,} samples) to fit available memory.")
+        _say(f"  Filled {len(vq_banks)} banks ({args.max_banks} max), "
+             f"encoded {_fmt_duration(encoded_duration)} "
+             f"of {_fmt_duration(input_duration)}")
+        _say(f"  Truncated {_fmt_duration(lost_sec)} "
+             f"({lost:,} samples) to fit available memory.")
     else:
         compression = samples_compressed / (len(vq_banks) * 16384) if vq_banks else 1
-        print(f"  {len(vq_banks)} banks, "
-              f"{compression:.1f}\u00d7 compression (vec_size={vs})")
+        _say(f"  {len(vq_banks)} banks, "
+             f"{compression:.1f}\u00d7 compression (vec_size={vs})")
 
     return vq_banks, encoded_duration, truncated, f'VQ{vs}'
 
 
-def _encode_lz(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
-               noise_shaping, input_duration):
-    """Encode audio with DeltaLZ compression."""
+def _encode_lz(args, encode, actual_rate, bytes_per_sec, noise_shaping,
+               input_duration, pending_checks):
+    """Encode audio with DeltaLZ compression.
+
+    With --verbose, decompression is verified on a worker thread; its
+    future is appended to pending_checks so it overlaps ASM generation.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from .audio import encode_indices
+    from .compress import compress_banks
     enc_mode = args.mode
     mode_label_enc = "1CPS" if enc_mode == '1cps' else f"{args.channels}-channel"
     ns_label = 'noise-shaped' if noise_shaping else 'nearest'
     if args.enhance:
         ns_label += '+enhanced'
-    print(f"\nEncoding (mono, {mode_label_enc}, {ns_label})...")
-    indices = encode_indices(audio_rs, n_channels, False, noise_shaping,
-                            sample_rate=int(actual_rate),
-                            pokey_channels=args.channels,
-                            mode=enc_mode, enhance=args.enhance)
-    print(f"  {len(indices):,} samples at {bytes_per_sec:,.0f} samples/sec")
+    _say(f"\nEncoding (mono, {mode_label_enc}, {ns_label})...")
+    _flush_output()
+    indices = encode(encode_indices, noise_shaping=noise_shaping,
+                     sample_rate=int(actual_rate),
+                     pokey_channels=args.channels,
+                     mode=enc_mode, enhance=args.enhance)
+    _say(f"  {len(indices):,} samples at {bytes_per_sec:,.0f} samples/sec")
 
     use_delta = (enc_mode != '1cps')
     lz_label = 'DeltaLZ' if use_delta else 'RawLZ'
-    print(f"\nCompressing ({lz_label})...")
-    compressed_banks, samples_compressed = compress_banks(
+    _say(f"\nCompressing ({lz_label})...")
+    _flush_output()
+    compressed_banks, samples_compressed, comp_size = compress_banks(
         indices, bank_size=16384, max_banks=args.max_banks,
-        progress_fn=_compress_progress, use_delta=use_delta)
-    print()
+        progress_fn=_throttled(_draw_compress_progress),
+        use_delta=use_delta, jobs=args.jobs)
+    _end_progress()
 
-    comp_size = sum(len(b) for b in compressed_banks)
     encoded_duration = samples_compressed / bytes_per_sec
     truncated = samples_compressed < len(indices)
 
     if truncated:
         lost = len(indices) - samples_compressed
-        print(f"  Filled {len(compressed_banks)} banks "
-              f"({args.max_banks} max), encoded {_fmt_duration(encoded_duration)} "
-              f"of {_fmt_duration(input_duration)}")
+        _say(f"  Filled {len(compressed_banks)} banks "
+             f"({args.max_banks} max), encoded {_fmt_duration(encoded_duration)} "
+             f"of {_fmt_duration(input_duration)}")
     else:
         ratio = comp_size / samples_compressed if samples_compressed > 0 else 1.0
-        print(f"  {len(compressed_banks)} banks, "
-              f"{comp_size:,} bytes, ratio {ratio:.0%}")
+        _say(f"  {len(compressed_banks)} banks, "
+             f"{comp_size:,} bytes, ratio {ratio:.0%}")
 
     if args.verbose:
-        print(f"  Verifying decompression...")
-        result = bytearray()
-        for bank_data in compressed_banks:
-            result.extend(decompress_bank(bank_data, use_delta))
-        expected = indices[:samples_compressed]
-        if bytes(result) != bytes(expected):
-            raise CompressionError(
-                f"Verification failed: expected {len(expected)}, "
-                f"got {len(result)}")
-        print(f"  OK ({len(result):,} samples)")
+        _say(f"  Verifying decompression in background...")
+        pool = ThreadPoolExecutor(max_workers=1)
+        pending_checks.append(pool.submit(
+            _verify_decompress, compressed_banks,
+            indices[:samples_compressed], use_delta))
+        pool.shutdown(wait=False)
 
     mode_label = '1CPS-DeltaLZ' if enc_mode == '1cps' else 'DeltaLZ'
     return compressed_banks, encoded_duration, truncated, mode_label
 
 
-def _encode_raw(args, audio_rs, n_channels, actual_rate, bytes_per_sec,
-                noise_shaping, input_duration):
+def _encode_raw(args, encode, actual_rate, bytes_per_sec, noise_shaping,
+                input_duration):
     """Encode audio uncompressed."""
+    from .audio import encode_audio
     ns_label = 'noise-shaped' if noise_shaping else 'nearest'
     if args.enhance:
         ns_label += '+enhanced'
-    print(f"\nEncoding (mono, {args.channels}-channel, {ns_label})...")
-    encoded = encode_audio(audio_rs, n_channels, False, noise_shaping,
-                           sample_rate=int(actual_rate),
-                           pokey_channels=args.channels,
-                           enhance=args.enhance)
-    print(f"  {len(encoded):,} bytes ({len(encoded) // 1024}KB) "
-          f"at {bytes_per_sec:,.0f} bytes/sec")
+    _say(f"\nEncoding (mono, {args.channels}-channel, {ns_label})...")
+    _flush_output()
+    encoded = encode(encode_audio, noise_shaping=noise_shaping,
+                     sample_rate=int(actual_rate),
+                     pokey_channels=args.channels,
+                     enhance=args.enhance)
+    _say(f"  {len(encoded):,} bytes ({len(encoded) // 1024}KB) "
+         f"at {bytes_per_sec:,.0f} bytes/sec")
 
     max_raw = args.max_banks * 16384
     truncated = len(encoded) > max_raw
+    encoded = memoryview(encoded)  # truncate and split without copying
     if truncated:
         encoded = encoded[:max_raw]
         encoded_duration = max_raw / bytes_per_sec
-        print(f"\n  Truncated to {_fmt_duration(encoded_duration)} "
-              f"of {_fmt_duration(input_duration)} "
-              f"to fit {args.max_banks} banks ({max_raw // 1024}KB).")
+        _say(f"\n  Truncated to {_fmt_duration(encoded_duration)} "
+             f"of {_fmt_duration(input_duration)} "
+             f"to fit {args.max_banks} banks ({max_raw // 1024}KB).")
     else:
         encoded_duration = len(encoded) / bytes_per_sec
 
     banks = split_into_banks(encoded, args.max_banks)
-    print(f"\n  {len(banks)} banks, {sum(len(b) for b in banks):,} bytes")
+    _say(f"\n  {len(banks)} banks, {len(encoded):,} bytes")
 
     return banks, encoded_duration, truncated, 'RAW'
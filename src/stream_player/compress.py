@@ -27,6 +27,10 @@ Bank format:
   Byte 1+:    Compressed delta stream (DeltaLZ tokens)
 """
 
+import bisect
+
+import numpy as np
+
 from .errors import CompressionError
 
 # LZ parameters
@@ -34,9 +38,11 @@ MIN_MATCH = 3
 MAX_MATCH = 66       # (0x3F + 3)
 MAX_SHORT_OFF = 255
 MAX_LONG_OFF = 16383
-HASH_SIZE = 8192
 CHAIN_LEN = 96
 MAX_LITERAL = 127
+# After this many literals in a row the data is treated as incompressible:
+# the match search then skips ahead, one more byte per 256 further literals.
+SKIP_AFTER = 2048
 
 # Block header: 1 byte (delta_acc seed)
 HEADER_SIZE = 1
@@ -61,26 +67,28 @@ def compress_bank(indices: bytes, prev_value: int = 0,
     if not indices:
         return bytes([prev_value & 0xFF, 0x00]), buf_pos
 
-    if use_delta:
-        # Delta encode
-        deltas = bytearray(len(indices))
-        deltas[0] = (indices[0] - prev_value) & 0xFF
-        for i in range(1, len(indices)):
-            deltas[i] = (indices[i] - indices[i - 1]) & 0xFF
-        to_compress = bytes(deltas)
-    else:
-        # Raw LZ — no delta preprocessing
-        to_compress = bytes(indices)
-
+    to_compress = _lz_input(indices, prev_value, use_delta)
     compressed, new_buf_pos = _lz_compress(to_compress, buf_pos)
 
     header = bytes([prev_value & 0xFF])
     return header + compressed, new_buf_pos
 
 
+def _lz_input(indices, prev_value, use_delta):
+    """Bytes the LZ stage sees: deltas for DeltaLZ, raw values for 1CPS."""
+    if not use_delta:
+        return bytes(indices)
+    # Delta encode (uint8 arithmetic wraps mod 256)
+    arr = np.frombuffer(indices, dtype=np.uint8)
+    deltas = np.empty_like(arr)
+    deltas[0] = (int(arr[0]) - int(prev_value)) & 0xFF
+    np.subtract(arr[1:], arr[:-1], out=deltas[1:])
+    return deltas.tobytes()
+
+
 def compress_banks(indices: bytes, bank_size: int = 16384,
                    max_banks: int = 64, progress_fn=None,
-                   use_delta: bool = True) -> tuple:
+                   use_delta: bool = True, jobs: int = 1) -> tuple:
     """Split indices into banks, filling each bank as full as possible.
 
     Uses binary search to find the maximum chunk size that compresses
@@ -92,18 +100,115 @@ def compress_banks(indices: bytes, bank_size: int = 16384,
         max_banks: Maximum number of banks
         progress_fn: Optional callback(samples_done, total, bank_count)
         use_delta: True for DeltaLZ (scalar), False for raw LZ (1CPS)
+        jobs: Worker processes.  Above 1, contiguous segments are packed
+            in parallel (see _compress_banks_parallel); the last bank of
+            each segment may be partly filled.  When max_banks cannot
+            hold the whole input the serial packer is used, so -j never
+            shortens the output.
 
     Returns:
-        (banks, samples_compressed)
+        (banks, samples_compressed, total_bytes) — total_bytes is the
+        summed size of all banks
     """
     if not indices:
-        return [], 0
+        return [], 0, 0
+    if jobs > 1:
+        return _compress_banks_parallel(indices, bank_size, max_banks,
+                                        progress_fn, use_delta, jobs)
+    return _compress_serial(indices, bank_size, max_banks, progress_fn,
+                            use_delta)
+
+
+def _compress_banks_parallel(indices, bank_size, max_banks, progress_fn,
+                             use_delta, jobs):
+    """compress_banks() over contiguous segments in worker processes.
+
+    Banks are self-contained given the preceding sample (delta seed) and
+    the decode buffer position, which is simply the sample offset modulo
+    DECODE_BUF_SIZE, so segments can be packed independently and
+    concatenated.
+
+    The partly filled bank at each segment boundary costs capacity, so
+    when max_banks is the limit this packer would fit less audio than
+    the serial one.  Inputs estimated not to fit are packed serially up
+    front, and a parallel run that still runs out of banks is redone
+    serially.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    total = len(indices)
+    sample = indices[:min(bank_size, total)]
+    sample_comp, _ = compress_bank(sample, 0, 0, use_delta)
+    est_ratio = len(sample_comp) / len(sample)
+    per_bank = bank_size / max(est_ratio, 0.05)  # samples per full bank
+    # Each segment boundary leaves one partly filled bank; keep segments
+    # several banks long so that waste stays small.
+    n_seg = min(jobs, int(total / (4 * per_bank)))
+    if n_seg < 2 or total > (max_banks - n_seg) * per_bank:
+        return _compress_serial(indices, bank_size, max_banks, progress_fn,
+                                use_delta)
+    bounds = [total * i // n_seg for i in range(n_seg + 1)]
+
+    banks = []
+    total_bytes = 0
+    pos = 0
+    with ProcessPoolExecutor(max_workers=n_seg) as pool:
+        futures = [
+            (hi - lo, pool.submit(_compress_segment, indices[lo:hi],
+                                  indices[lo - 1] if lo else 0,
+                                  lo % DECODE_BUF_SIZE, bank_size,
+                                  max_banks, use_delta))
+            for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+        for seg_len, fut in futures:
+            seg_banks, seg_pos, seg_bytes, seg_lens = fut.result()
+            take = min(len(seg_banks), max_banks - len(banks))
+            banks.extend(seg_banks[:take])
+            total_bytes += sum(len(b) for b in seg_banks[:take])
+            pos += sum(seg_lens[:take])
+            if progress_fn:
+                progress_fn(pos, total, len(banks))
+            if take < len(seg_banks) or seg_pos < seg_len:
+                # Out of banks: the stream must stay contiguous
+                for _, rest in futures:
+                    rest.cancel()
+                break
+
+    if pos < total:
+        # Boundary waste cost audio: the serial packer fits more
+        return _compress_serial(indices, bank_size, max_banks, progress_fn,
+                                use_delta)
+    return banks, pos, total_bytes
+
 
+def _compress_serial(indices, bank_size, max_banks, progress_fn, use_delta):
+    """compress_banks() in this process, as one segment."""
+    banks, pos, total_bytes, _ = _compress_segment(
+        indices, 0, 0, bank_size, max_banks, use_delta, progress_fn)
+    return banks, pos, total_bytes
+
+
+def _compress_segment(indices, prev_val, buf_pos, bank_size, max_banks,
+                      use_delta, progress_fn=None):
+    """Pack a contiguous run of indices into banks (serial binary search).
+
+    Each trial length is sized with a _PrefixSizer rather than compressed
+    from scratch; only the chosen length of each bank is compressed.
+
+    Args:
+        indices: The run's index values
+        prev_val: Index value preceding the run (0 at stream start)
+        buf_pos: Decode buffer position at the run's first sample
+
+    Returns:
+        (banks, samples_compressed, total_bytes, samples_per_bank)
+    """
+    # Per-bank slices of the remaining run are views, not copies
+    indices = memoryview(indices)
     total = len(indices)
     banks = []
+    bank_lens = []
+    total_bytes = 0
     pos = 0
-    prev_val = 0
-    buf_pos = 0
 
     # Initial compression ratio estimate
     sample = indices[:min(bank_size, total)]
@@ -113,78 +218,62 @@ def compress_banks(indices: bytes, bank_size: int = 16384,
 
     while pos < total and len(banks) < max_banks:
         remaining = total - pos
+        sizer = _PrefixSizer(indices[pos:], prev_val, buf_pos, use_delta,
+                             bank_size, 2 * chunk_guess)
+        size = sizer.size
 
         # Quick check: does everything remaining fit in one bank?
-        comp_all, bp_all = compress_bank(
-            indices[pos:pos + remaining], prev_val, buf_pos, use_delta)
-        if len(comp_all) <= bank_size:
-            banks.append(comp_all)
-            prev_val = indices[pos + remaining - 1]
-            buf_pos = bp_all
-            pos += remaining
-            if progress_fn:
-                progress_fn(pos, total, len(banks))
-            break
-
-        # Binary search for the maximum chunk that fits in bank_size.
-        # Invariant: lo always fits, hi never fits.
-        lo = 1024
-        hi = min(chunk_guess * 2, remaining)
-
-        # Ensure lo fits
-        comp_lo, bp_lo = compress_bank(
-            indices[pos:pos + lo], prev_val, buf_pos, use_delta)
-        while len(comp_lo) > bank_size and lo > 64:
-            lo = lo // 2
-            comp_lo, bp_lo = compress_bank(
-                indices[pos:pos + lo], prev_val, buf_pos, use_delta)
-        best_comp, best_bp, best_len = comp_lo, bp_lo, lo
-
-        # Ensure hi doesn't fit (find upper bound)
-        comp_hi, bp_hi = compress_bank(
-            indices[pos:pos + hi], prev_val, buf_pos, use_delta)
-        if len(comp_hi) <= bank_size:
-            # hi fits — keep expanding
-            best_comp, best_bp, best_len = comp_hi, bp_hi, hi
-            while hi < remaining:
-                hi2 = min(hi + bank_size, remaining)
-                if hi2 == hi:
-                    break
-                comp2, bp2 = compress_bank(
-                    indices[pos:pos + hi2], prev_val, buf_pos, use_delta)
-                if len(comp2) > bank_size:
-                    hi = hi2  # found a value that doesn't fit
-                    break
-                best_comp, best_bp, best_len = comp2, bp2, hi2
-                hi = hi2
-            else:
-                # Reached end of data without overflowing — handled above
-                pass
-
-        # Binary search between best_len (fits) and hi (doesn't fit)
-        if hi > best_len + 256:
-            search_lo = best_len
-            search_hi = hi
-            while search_hi - search_lo > 64:
-                mid = (search_lo + search_hi) // 2
-                comp, bp = compress_bank(
-                    indices[pos:pos + mid], prev_val, buf_pos, use_delta)
-                if len(comp) <= bank_size:
-                    search_lo = mid
-                    best_comp, best_bp, best_len = comp, bp, mid
-                else:
-                    search_hi = mid
-
-            # Fine-tune near the boundary
-            for try_len in range(best_len, min(best_len + 512, remaining + 1), 16):
-                comp, bp = compress_bank(
-                    indices[pos:pos + try_len], prev_val, buf_pos, use_delta)
-                if len(comp) <= bank_size:
-                    best_comp, best_bp, best_len = comp, bp, try_len
-                else:
-                    break
+        if size(remaining) <= bank_size:
+            best_len = remaining
+        else:
+            # Binary search for the maximum chunk that fits in bank_size.
+            # Invariant: lo always fits, hi never fits.
+            lo = 1024
+            hi = min(chunk_guess * 2, remaining)
+
+            # Ensure lo fits
+            while size(lo) > bank_size and lo > 64:
+                lo = lo // 2
+            best_len = lo
+
+            # Ensure hi doesn't fit (find upper bound)
+            if size(hi) <= bank_size:
+                # hi fits — keep expanding
+                best_len = hi
+                while hi < remaining:
+                    hi2 = min(hi + bank_size, remaining)
+                    if hi2 == hi:
+                        break
+                    if size(hi2) > bank_size:
+                        hi = hi2  # found a value that doesn't fit
+                        break
+                    best_len = hi2
+                    hi = hi2
+
+            # Binary search between best_len (fits) and hi (doesn't fit)
+            if hi > best_len + 256:
+                search_lo = best_len
+                search_hi = hi
+                while search_hi - search_lo > 64:
+                    mid = (search_lo + search_hi) // 2
+                    if size(mid) <= bank_size:
+                        search_lo = mid
+                        best_len = mid
+                    else:
+                        search_hi = mid
+
+                # Fine-tune near the boundary
+                for try_len in range(best_len, min(best_len + 512, remaining + 1), 16):
+                    if size(try_len) <= bank_size:
+                        best_len = try_len
+                    else:
+                        break
 
+        best_comp, best_bp = compress_bank(
+            indices[pos:pos + best_len], prev_val, buf_pos, use_delta)
         banks.append(best_comp)
+        bank_lens.append(best_len)
+        total_bytes += len(best_comp)
         prev_val = indices[pos + best_len - 1]
         buf_pos = best_bp
         pos += best_len
@@ -196,7 +285,127 @@ def compress_banks(indices: bytes, bank_size: int = 16384,
         if progress_fn:
             progress_fn(pos, total, len(banks))
 
-    return banks, pos
+    return banks, pos, total_bytes, bank_lens
+
+
+class _PrefixSizer:
+    """len(compress_bank(indices[:x], ...)) for any x, without compressing
+    each prefix from scratch.
+
+    The greedy parse only sees the end of its input through the match
+    length limit, so the parse of a prefix of length x makes the same
+    decisions as the parse of the whole run at every position at least
+    MAX_MATCH bytes before x.  The whole-run parse is advanced lazily in
+    size-only mode and its state (position, bytes emitted, pending
+    literals, literal streak) recorded at every step; a probe resumes
+    from the last state safely before x and parses only the remaining
+    tail.
+
+    Sizes above `limit` are only reported as some value above `limit`:
+    once the whole-run parse has emitted more than that, every longer
+    prefix is known not to fit and the parse stops.
+    """
+
+    def __init__(self, indices, prev_value, buf_pos, use_delta, limit,
+                 window):
+        self.indices = indices
+        self.prev_value = prev_value
+        self.buf_pos = buf_pos
+        self.use_delta = use_delta
+        self.limit = limit
+        self.total = len(indices)
+        self.window = 0
+        self._grow(window)
+        self.ck_pos = [0]
+        self.ck_out = [HEADER_SIZE]
+        self.ck_lit = [0]
+        self.ck_streak = [0]
+        self.over = None  # first recorded position whose output > limit
+
+    def _grow(self, need):
+        """Make data/prev cover at least `need` samples (doubling)."""
+        if need <= self.window or self.window >= self.total:
+            return
+        self.window = min(self.total, max(need, 2 * self.window))
+        self.data = _lz_input(self.indices[:self.window], self.prev_value,
+                              self.use_delta)
+        self.prev = _hash_chains(self.data)
+
+    def _advance(self, target):
+        """Extend the whole-run parse until it has reached `target`."""
+        while (self.ck_pos[-1] < target and self.ck_pos[-1] < self.total
+               and self.over is None):
+            # Positions parsed with n = total need MAX_MATCH bytes ahead
+            self._grow(min(target, self.total) + MAX_MATCH)
+            stop = min(target, self.window - MAX_MATCH)
+            if self.window == self.total:
+                stop = target
+            self._parse(self.ck_pos[-1], self.ck_out[-1], self.ck_lit[-1],
+                        self.ck_streak[-1], self.total, stop, record=True)
+
+    def size(self, x):
+        """Compressed bank size for the first x samples (see class doc)."""
+        x = min(x, self.total)  # like slicing past the end
+        if x <= 0:
+            return HEADER_SIZE + 1
+        safe = x - MAX_MATCH
+        if safe > 0:
+            self._advance(safe)
+            if self.over is not None and self.over <= safe:
+                return self.limit + 1
+        i = bisect.bisect_right(self.ck_pos, max(safe, 0)) - 1
+        self._grow(x)
+        pos, out, lit = self._parse(self.ck_pos[i], self.ck_out[i],
+                                    self.ck_lit[i], self.ck_streak[i], x, x,
+                                    record=False)
+        if out > self.limit:
+            return self.limit + 1
+        if lit:
+            out += 1 + lit
+        return out + 1  # end token
+
+    def _parse(self, pos, out, lit, streak, n, stop, record):
+        """Size-only twin of _lz_compress's loop over data[:n]."""
+        data = self.data
+        prev = self.prev
+        buf_pos = self.buf_pos
+        limit = self.limit
+        while pos < stop:
+            if pos + MIN_MATCH <= n:
+                best_len, best_off = _find_match(
+                    data, prev, pos, n, (buf_pos + pos) % DECODE_BUF_SIZE)
+            else:
+                best_len = best_off = 0
+
+            match_cost = 2 if (best_off <= MAX_SHORT_OFF) else 3
+            if best_len >= MIN_MATCH and best_len > match_cost:
+                if lit:
+                    out += 1 + lit
+                    lit = 0
+                out += match_cost
+                pos += best_len
+                streak = 0
+            else:
+                step = 1 if streak < SKIP_AFTER else min(
+                    1 + ((streak - SKIP_AFTER) >> 8), n - pos)
+                lit += step
+                pos += step
+                streak += step
+                while lit >= MAX_LITERAL:
+                    out += 1 + MAX_LITERAL
+                    lit -= MAX_LITERAL
+
+            if record:
+                self.ck_pos.append(pos)
+                self.ck_out.append(out)
+                self.ck_lit.append(lit)
+                self.ck_streak.append(streak)
+                if out > limit:
+                    self.over = pos
+                    break
+            elif out > limit:
+                break
+        return pos, out, lit
 
 
 def decompress_bank(data: bytes, use_delta: bool = True) -> bytes:
@@ -212,13 +421,10 @@ def decompress_bank(data: bytes, use_delta: bool = True) -> bytes:
     raw = _lz_decompress(compressed)
 
     if use_delta:
-        initial_value = data[0]
-        out = bytearray(len(raw))
-        acc = initial_value
-        for i in range(len(raw)):
-            acc = (acc + raw[i]) & 0xFF
-            out[i] = acc
-        return bytes(out)
+        # Running sum of the deltas; uint8 arithmetic wraps mod 256
+        out = np.cumsum(np.frombuffer(raw, dtype=np.uint8), dtype=np.uint8)
+        out += np.uint8(data[0])
+        return out.tobytes()
     else:
         # Raw LZ — data is already the final values
         return bytes(raw)
@@ -246,110 +452,140 @@ def _lz_compress(data: bytes, initial_buf_pos: int = 0) -> tuple:
     if n == 0:
         return bytes([0x00]), initial_buf_pos % buf_size
 
-    def bp_at(p):
-        return (initial_buf_pos + p) % buf_size
-
-    heads = [[] for _ in range(HASH_SIZE)]
-    output = bytearray()
-    literal_buf = bytearray()
+    prev = _hash_chains(data)
+    # Worst case: every byte literal, one count byte per 127, end token
+    output = bytearray(n + n // MAX_LITERAL + 2)
+    out = 0
+    lit_start = 0  # pending literals are data[lit_start:pos]
+    streak = 0     # literals since the last match
     pos = 0
 
     while pos < n:
-        bp = bp_at(pos)
-
-        # How far back can matches reach?
-        # After a wrap, only data written since the wrap is valid.
-        # match_window = bp (bytes since the last wrap boundary).
-        # If bp==0 and pos>0, a wrap just happened: window is 0.
-        match_window = bp
-
-        best_len = 0
-        best_off = 0
-
         if pos + MIN_MATCH <= n:
-            hv = _hash3(data, pos, n)
-            chain = heads[hv]
-            max_len = min(MAX_MATCH, n - pos)
-
-            for cand in reversed(chain[-CHAIN_LEN:]):
-                offset = pos - cand
-                if offset < 1:
-                    continue
-                if offset > MAX_LONG_OFF:
-                    continue
-                # Can't reach back past the last buffer wrap
-                if offset > match_window:
-                    continue
-                if data[cand] != data[pos]:
-                    continue
-                # Match source: buffer positions [bp-offset, bp-offset+len).
-                # Must stay within [0, buf_size) — no source wrapping.
-                # bp - offset >= 0 is guaranteed by offset <= match_window = bp.
-                # Upper bound: bp - offset + length <= buf_size
-                #   → length <= buf_size - bp + offset
-                max_src_len = buf_size - bp + offset
-                lim = min(max_len, max_src_len)
-                length = 0
-                while length < lim and data[cand + length] == data[pos + length]:
-                    length += 1
-                if length > best_len or (length == best_len and offset < best_off):
-                    best_len = length
-                    best_off = offset
-                    if length == max_len:
-                        break
-
-            heads[hv].append(pos)
-            if len(heads[hv]) > CHAIN_LEN:
-                heads[hv] = heads[hv][-CHAIN_LEN:]
+            best_len, best_off = _find_match(
+                data, prev, pos, n, (initial_buf_pos + pos) % buf_size)
+        else:
+            best_len = best_off = 0
 
         match_cost = 2 if (best_off <= MAX_SHORT_OFF) else 3
         if best_len >= MIN_MATCH and best_len > match_cost:
             # Flush pending literals before emitting match token
-            if literal_buf:
-                _flush_literals(output, literal_buf)
-                literal_buf = bytearray()
+            if lit_start < pos:
+                out = _flush_literals(output, out, data, lit_start, pos)
 
             enc_len = best_len - 3
             if best_off <= MAX_SHORT_OFF:
-                output.append(0x80 | (enc_len & 0x3F))
-                output.append(best_off & 0xFF)
+                output[out] = 0x80 | (enc_len & 0x3F)
+                output[out + 1] = best_off & 0xFF
+                out += 2
             else:
-                output.append(0xC0 | (enc_len & 0x3F))
-                output.append(best_off & 0xFF)
-                output.append((best_off >> 8) & 0xFF)
-
-            for k in range(1, best_len):
-                p = pos + k
-                if p + 2 < n:
-                    hv2 = _hash3(data, p, n)
-                    heads[hv2].append(p)
-                    if len(heads[hv2]) > CHAIN_LEN:
-                        heads[hv2] = heads[hv2][-CHAIN_LEN:]
+                output[out] = 0xC0 | (enc_len & 0x3F)
+                output[out + 1] = best_off & 0xFF
+                output[out + 2] = (best_off >> 8) & 0xFF
+                out += 3
+
             pos += best_len
+            lit_start = pos
+            streak = 0
         else:
-            # Accumulate literal
-            literal_buf.append(data[pos])
-            pos += 1
-            if len(literal_buf) >= MAX_LITERAL:
-                _flush_literals(output, literal_buf)
-                literal_buf = bytearray()
+            # Literal: stays in data until the run is flushed
+            step = 1 if streak < SKIP_AFTER else min(
+                1 + ((streak - SKIP_AFTER) >> 8), n - pos)
+            pos += step
+            streak += step
 
     # Flush remaining literals
-    if literal_buf:
-        _flush_literals(output, literal_buf)
+    if lit_start < pos:
+        out = _flush_literals(output, out, data, lit_start, pos)
+
+    output[out] = 0x00
+    out += 1
+    return (bytes(memoryview(output)[:out]),
+            (initial_buf_pos + pos) % buf_size)
+
+
+def _hash_chains(data):
+    """Match-candidate chains: prev[p] is the nearest position before p
+    starting with the same three bytes, or -1.
+
+    Every position with three bytes available is linked, which is exactly
+    the set a sequential per-key insertion has seen by the time the parser
+    reaches p.  A chain therefore depends only on the data before p, so one
+    table serves any prefix of `data`.  Keys are the 24-bit values of the
+    three bytes themselves, so chains hold no hash collisions.
+    """
+    n = len(data)
+    prev = np.full(n, -1, dtype=np.int64)
+    m = n - 2  # positions p with p + 3 <= n
+    if m > 0:
+        d = np.frombuffer(data, dtype=np.uint8, count=n).astype(np.int32)
+        key = (d[:m] << 16) | (d[1:m + 1] << 8) | d[2:]
+        order = np.argsort(key, kind='stable')
+        same = key[order[1:]] == key[order[:-1]]
+        prev[order[1:][same]] = order[:-1][same]
+    return prev.tolist()
+
+
+def _find_match(data, prev, pos, n, bp):
+    """Longest usable match for data[pos:n] as (length, offset), or (0, 0).
+
+    bp is the decode buffer position of pos.  Walks up to CHAIN_LEN
+    candidates, newest first.
+    """
+    room = DECODE_BUF_SIZE - bp  # buffer bytes from bp to the end
+    max_len = min(MAX_MATCH, n - pos)
+    best_len = 0
+    best_off = 0
+    cand = prev[pos]
+    steps = CHAIN_LEN
+    # Newest first: offsets only grow along the chain, so the first
+    # candidate reaching a given length is also the nearest, and once one
+    # is out of reach all the rest are too.
+    while cand >= 0 and steps:
+        offset = pos - cand
+        # Can't reach back past the last buffer wrap: only data written
+        # since the wrap is valid.  (The window is at most
+        # buf_size - 1 == MAX_LONG_OFF.)
+        if offset > bp:
+            break
+        # Match source: buffer positions [bp-offset, bp-offset+len).
+        # Must stay within [0, buf_size) — no source wrapping.
+        # bp - offset >= 0 is guaranteed by offset <= bp.
+        # Upper bound: bp - offset + length <= buf_size
+        #   → length <= buf_size - bp + offset
+        lim = room + offset
+        if lim > max_len:
+            lim = max_len
+        # Only a longer match can replace the best one: reject on the byte
+        # that would have to extend it, then check the bytes before it with
+        # one slice compare (a C memcmp) before extending byte by byte.
+        if lim > best_len and data[cand + best_len] == data[pos + best_len]:
+            length = best_len + 1
+            if data[cand:cand + length] == data[pos:pos + length]:
+                while length < lim and data[cand + length] == data[pos + length]:
+                    length += 1
+                best_len = length
+                best_off = offset
+                if length == max_len:
+                    break
+        cand = prev[cand]
+        steps -= 1
+    return best_len, best_off
 
-    output.append(0x00)
-    return bytes(output), bp_at(pos)
 
+def _flush_literals(output: bytearray, out: int, data: bytes,
+                    start: int, end: int) -> int:
+    """Write data[start:end] at output[out:] as literal tokens (max 127 each).
 
-def _flush_literals(output: bytearray, buf: bytearray):
-    """Flush literal buffer as one or more literal tokens (max 127 each)."""
-    p = 0
-    while p < len(buf):
-        chunk = min(len(buf) - p, MAX_LITERAL)
-        output.append(chunk)
-        output.extend(buf[p:p + chunk])
-        p += chunk
+    Returns:
+        New output cursor.
+    """
+    for p in range(start, end, MAX_LITERAL):
+        chunk = min(end - p, MAX_LITERAL)
+        output[out] = chunk
+        output[out + 1:out + 1 + chunk] = data[p:p + chunk]
+        out += 1 + chunk
+    return out
 
 
 def _lz_decompress(data: bytes) -> bytes:
@@ -384,14 +620,11 @@ def _copy_match(output: bytearray, offset: int, length: int):
     if offset == 0 or offset > len(output):
         raise CompressionError(f"Invalid offset {offset} (output size {len(output)})")
     src = len(output) - offset
-    for i in range(length):
-        output.append(output[src + i])
-
-
-def _hash3(data: bytes, pos: int, n: int) -> int:
-    if pos + 2 >= n:
-        return 0
-    return ((data[pos] * 2654435761 + data[pos + 1]) * 31 + data[pos + 2]) % HASH_SIZE
+    if offset >= length:
+        output.extend(output[src:src + length])
+    else:
+        # Overlapping copy: the last `offset` bytes repeat
+        output.extend((output[src:] * (length // offset + 1))[:length])
 
 
 def estimate_ratio(indices: bytes) -> float:
@@ -23,6 +23,10 @@ like crackling. It's kept available for experimentation at higher
 sample rates or with more channels.
 """
 
+import functools
+from array import array
+from bisect import bisect_left
+
 import numpy as np
 import scipy.signal
 
@@ -51,12 +55,18 @@ def compress_dynamics(audio: np.ndarray, strength: float = 0.5) -> np.ndarray:
     # strength 0.5 → μ=64 (~10 dB), 1.0 → μ=255 (~20 dB)
     mu = 255.0 * strength
 
-    compressed = np.sign(audio) * np.log1p(mu * np.abs(audio)) / np.log1p(mu)
-    return compressed.astype(np.float32)
+    # sign(x) * log1p(mu*|x|) / log1p(mu), built up in one buffer
+    out = np.abs(audio)
+    out *= mu
+    np.log1p(out, out=out)
+    np.divide(out, np.log1p(mu), out=out)
+    np.copysign(out, audio, out=out)
+    return out.astype(np.float32, copy=False)
 
 
 # ─── ZOH PRE-EMPHASIS ─────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=8)
 def design_zoh_preemphasis(sample_rate: int, n_taps: int = 15) -> np.ndarray:
     """Design FIR filter that compensates for zero-order hold rolloff.
 
@@ -71,6 +81,9 @@ def design_zoh_preemphasis(sample_rate: int, n_taps: int = 15) -> np.ndarray:
     crackling at low bit depths. Longer filters have sharper response
     but produce transients that the 31-level quantizer can't track.
 
+    Results are cached per (sample_rate, n_taps), so the returned
+    array is shared and read-only.
+
     Args:
         sample_rate: sample rate in Hz
         n_taps: FIR filter length (odd, default 15)
@@ -109,6 +122,7 @@ def design_zoh_preemphasis(sample_rate: int, n_taps: int = 15) -> np.ndarray:
         mid = n_taps // 2
         h[mid] = 1.28
         h[mid - 1] = -0.28
+        h.setflags(write=False)
         return h
 
     # Normalize to unity gain at DC
@@ -116,6 +130,7 @@ def design_zoh_preemphasis(sample_rate: int, n_taps: int = 15) -> np.ndarray:
     if abs(dc_gain) > 1e-6:
         h = h / dc_gain
 
+    h.setflags(write=False)
     return h
 
 
@@ -170,38 +185,59 @@ def quantize_shaped2(audio_scaled, table, leak=0.95):
     Returns:
         uint8 array of POKEY level indices
     """
-    n = len(audio_scaled)
-    table_max = table[-1]
+    audio_scaled = np.asarray(audio_scaled)
+    table = np.asarray(table)
     last_idx = len(table) - 1
-    out = np.zeros(n, dtype=np.uint8)
 
     # 2nd-order feedback coefficients
     # Designed for minimum-perceived-noise at 8 kHz sample rate
     c1 = 1.8    # 1st tap
     c2 = -0.85  # 2nd tap
 
+    # Serial error feedback on plain Python floats, as in
+    # tables._quantize: every operation is rounded through a one-element
+    # array of the NumPy result precision, so results match the NumPy
+    # scalar arithmetic this loop used to do.
+    levels = table.tolist()
+    table_max = levels[-1]
+    dtype = np.result_type(audio_scaled, table)
+    cell = array('f' if dtype == np.float32 else 'd', [0.0])
+    c1, c2, leak = array(cell.typecode, (c1, c2, leak))  # as NumPy casts them
+    out = bytearray(len(audio_scaled))
+
     e1 = 0.0  # error[n-1]
     e2 = 0.0  # error[n-2]
 
-    for i in range(n):
+    for i, x in enumerate(audio_scaled.tolist()):
         # Apply shaped error feedback
-        val = audio_scaled[i] + c1 * e1 + c2 * e2
-        val = max(0.0, min(val, table_max))
+        cell[0] = c1 * e1
+        cell[0] = x + cell[0]
+        acc = cell[0]
+        cell[0] = c2 * e2
+        cell[0] = acc + cell[0]
+        acc = cell[0]
+        val = table_max if acc > table_max else (acc if acc > 0.0 else 0.0)
 
         # Find nearest level
-        idx = int(np.searchsorted(table, val))
+        idx = bisect_left(levels, val)
         if idx > last_idx:
             idx = last_idx
-        elif idx > 0 and abs(val - table[idx - 1]) < abs(val - table[idx]):
-            idx -= 1
+        elif idx > 0:
+            cell[0] = val - levels[idx - 1]
+            below = abs(cell[0])
+            cell[0] = val - levels[idx]
+            if below < abs(cell[0]):
+                idx -= 1
         out[i] = idx
 
         # Update error state with leak
-        err = audio_scaled[i] + c1 * e1 + c2 * e2 - table[idx]
-        e2 = e1 * leak
-        e1 = err * leak
+        cell[0] = acc - levels[idx]
+        cell[0] = cell[0] * leak
+        e1, e2 = cell[0], e1 * leak
+        cell[0] = e2
+        e2 = cell[0]
 
-    return out
+    return np.frombuffer(out, dtype=np.uint8)
 
 
 # ─── COMBINED ENHANCEMENT ─────────────────────────────────────────
@@ -240,10 +276,13 @@ def enhance_audio(audio: np.ndarray, sample_rate: int,
     # Apply ZOH pre-emphasis
     boosted = apply_zoh_preemphasis(audio, sample_rate)
 
-    # Blend: partial compensation avoids amplifying quantization noise
-    out = audio * (1.0 - zoh_strength) + boosted * zoh_strength
+    # Blend: partial compensation avoids amplifying quantization noise.
+    # boosted is a fresh array, so scale it and accumulate in place.
+    boosted *= zoh_strength
+    out = audio * (1.0 - zoh_strength)
+    out += boosted
 
     # Clip to prevent overflow from pre-emphasis boost
-    out = np.clip(out, -1.0, 1.0).astype(np.float32)
+    np.clip(out, -1.0, 1.0, out=out)
 
-    return out
+    return out.astype(np.float32, copy=False)
@@ -37,11 +37,12 @@ def split_into_banks(data: bytes, max_banks: int = MAX_BANKS) -> list:
     """Split data into 16KB bank-sized chunks.
     
     Args:
-        data: Raw or compressed audio data
+        data: Raw or compressed audio data (any bytes-like object; a
+            memoryview yields zero-copy bank views)
         max_banks: Maximum number of banks allowed
         
     Returns:
-        List of bytes objects, each up to BANK_SIZE bytes
+        List of slices of data, each up to BANK_SIZE bytes
         
     Raises:
         BankOverflowError if data exceeds available banks
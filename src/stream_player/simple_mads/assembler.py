@@ -234,13 +234,14 @@ class Assembler:
                         evaluate(s.expr, symbols, pc) & 0xFFFF))
 
                 elif k == 'byte':
-                    for expr in s.exprs:
-                        put(bytes([evaluate(expr, symbols, pc) & 0xFF]))
+                    # One put per statement; * still sees each byte's PC
+                    put(bytes([evaluate(expr, symbols, pc + i) & 0xFF
+                               for i, expr in enumerate(s.exprs)]))
 
                 elif k == 'word':
-                    for expr in s.exprs:
-                        put(struct.pack('<H',
-                            evaluate(expr, symbols, pc) & 0xFFFF))
+                    put(struct.pack(f'<{len(s.exprs)}H', *[
+                        evaluate(expr, symbols, pc + 2 * i) & 0xFFFF
+                        for i, expr in enumerate(s.exprs)]))
 
                 elif k == 'instr':
                     put(encode(s.name, s.expr, symbols, pc))
@@ -3,6 +3,7 @@
 Parses operand strings, detects addressing modes, and emits machine code.
 """
 
+import functools
 import re
 
 from .opcodes import OPCODES, BRANCHES, SHIFT_OPS
@@ -13,10 +14,13 @@ class EncodeError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_operand(operand, mnemonic):
     """Parse operand string → (mode, expression_string).
 
     Mode may be a provisional mode like 'zp_or_abs' resolved later.
+    Pure in its arguments, so cached: every pass re-encodes the same
+    instructions.
     """
     s = operand.strip()
 
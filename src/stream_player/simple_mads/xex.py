@@ -31,22 +31,28 @@ class Segment:
         return f"Seg(${self.start:04X}-${self.end:04X}, {len(self.data)}b)"
 
 
-def build_xex(segments):
-    """Build XEX binary from a list of Segments.
+def xex_chunks(segments):
+    """Yield the XEX file as alternating header / segment-data chunks.
 
-    Returns:
-        bytes: Complete XEX file data.
+    Segment data is yielded as-is (not copied); empty segments are skipped.
     """
-    out = bytearray()
     for seg in segments:
         if not seg.data:
             continue
-        out.extend(b'\xFF\xFF')
         start = seg.start & 0xFFFF
         end = (start + len(seg.data) - 1) & 0xFFFF
-        out.extend(struct.pack('<HH', start, end))
-        out.extend(seg.data)
-    return bytes(out)
+        yield struct.pack('<HHH', 0xFFFF, start, end)
+        yield seg.data
+
+
+def build_xex(segments):
+    """Build XEX binary from a list of Segments.
+
+    Returns:
+        bytes: Complete XEX file data.
+    """
+    # One allocation of the final size; no growing buffer + bytes() copy
+    return b''.join(xex_chunks(segments))
 
 
 def make_init_segment(addr):
@@ -1,27 +1,36 @@
 """Shared splash screen utilities for player_code.py and asm_gen_vq.py."""
 
+import codecs
+import functools
 
-def to_screen_codes(text: str) -> list:
+
+# ASCII → ANTIC screen code, indexed by Latin-1 byte
+_SCREEN_CODES = bytes(
+    v - 0x20 if 0x20 <= v <= 0x5F else v if 0x60 <= v <= 0x7F else 0x00
+    for v in range(256))
+
+# Characters outside Latin-1 encode as NUL, which _SCREEN_CODES blanks
+codecs.register_error(
+    'stream_player.blank',
+    lambda e: ('\x00' * (e.end - e.start), e.end))
+
+
+@functools.lru_cache(maxsize=64)
+def to_screen_codes(text: str) -> bytes:
     """Convert ASCII text to ANTIC Mode 2 screen codes (40 chars).
 
     ANTIC Mode 2 uses internal character codes, not ASCII:
       ASCII $20-$5F → screen code $00-$3F (space through underscore)
       ASCII $60-$7F → screen code $60-$7F (lowercase, kept as-is)
+    Anything else becomes a blank ($00).
     """
-    codes = []
-    for ch in text[:40]:
-        v = ord(ch)
-        if 0x20 <= v <= 0x5F:
-            codes.append(v - 0x20)
-        elif 0x60 <= v <= 0x7F:
-            codes.append(v)
-        else:
-            codes.append(0x00)
+    codes = text[:40].encode('latin-1', 'stream_player.blank').translate(
+        _SCREEN_CODES)
     # Pad to 40 characters
-    codes.extend([0x00] * (40 - len(codes)))
-    return codes
+    return codes.ljust(40, b'\x00')
 
 
+@functools.lru_cache(maxsize=64)
 def format_info_line(pokey_channels, sample_rate, compress_mode='vq',
                      vec_size=4, ram_kb=64):
     """Format 40-column info line for splash screen.
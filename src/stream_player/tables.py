@@ -16,6 +16,10 @@ for POKEY's nonlinear voltage ladder. Noise shaping pushes this
 nonuniformity above the audible range.
 """
 
+import functools
+from array import array
+from bisect import bisect_left
+
 import numpy as np
 
 # Single channel: 16 levels (AUDC volume 0-15)
@@ -100,6 +104,7 @@ def get_table(n_channels):
     return _TABLE_CACHE[n_channels]
 
 
+@functools.lru_cache(maxsize=256)
 def index_to_volumes(idx, n_channels=4):
     """Convert level index to per-channel volume tuple."""
     _, alloc = get_table(n_channels)
@@ -185,16 +190,31 @@ def _quantize(audio, table, noise_shaping):
         err_left = np.abs(scaled - table[left])
         return np.where(err_left < err_right, left, indices).astype(np.uint8)
 
-    out = np.zeros(len(scaled), dtype=np.uint8)
+    # The error-feedback loop is inherently serial, so it runs on plain
+    # Python floats (NumPy scalar ops and a searchsorted call per sample
+    # cost microseconds each).  Results are rounded through a one-element
+    # array of the input's precision after every operation, so float32
+    # input keeps exactly the float32 arithmetic of NumPy scalars.
+    levels = table.tolist()
+    tmax = levels[-1]
+    cell = array('f' if scaled.dtype == np.float32 else 'd', [0.0])
+    out = bytearray(len(scaled))
     error = 0.0
-    for i in range(len(scaled)):
-        val = scaled[i] + error
-        val = max(0.0, min(val, table_max))
-        idx = int(np.searchsorted(table, val))
+    for i, s in enumerate(scaled.tolist()):
+        cell[0] = s + error
+        val = cell[0]
+        clamped = tmax if val > tmax else (val if val > 0.0 else 0.0)
+        idx = bisect_left(levels, clamped)
         if idx > last_idx:
             idx = last_idx
-        elif idx > 0 and abs(val - table[idx - 1]) < abs(val - table[idx]):
-            idx -= 1
+        elif idx > 0:
+            # Nearest of the two neighbouring levels (ties go up)
+            cell[0] = clamped - levels[idx - 1]
+            below = cell[0]
+            cell[0] = levels[idx] - clamped
+            if below < cell[0]:
+                idx -= 1
         out[i] = idx
-        error = scaled[i] + error - table[idx]
-    return out
+        cell[0] = val - levels[idx]
+        error = cell[0]
+    return np.frombuffer(out, dtype=np.uint8)
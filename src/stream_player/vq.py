@@ -33,6 +33,8 @@ actual data.  A silence entry is still ensured (replacing the least-used
 code) so zero-padded bank tails decode cleanly.
 """
 
+import functools
+
 import numpy as np
 from .errors import CompressionError
 
@@ -49,6 +51,37 @@ def vq_bank_geometry(vec_size):
     return cb_bytes, idx_per_bank, samp_per_bank
 
 
+def _make_assign_kernel(vec_size):
+    """Build a nearest-codeword kernel specialised for one vector size.
+
+    Accumulates squared distances one dimension at a time into a
+    (n_vecs, n_codes) buffer instead of materialising the full
+    (n_vecs, n_codes, vec_size) difference array.  Inputs are small
+    integers (or their centroids), so the result matches a plain
+    ``np.sum(..., axis=2)`` exactly.
+    """
+    def kernel(vf, codebook_f):
+        cb_t = np.ascontiguousarray(codebook_f.T)
+        diff = np.subtract.outer(vf[:, 0], cb_t[0])
+        dist = diff * diff
+        for k in range(1, vec_size):
+            np.subtract.outer(vf[:, k], cb_t[k], out=diff)
+            diff *= diff
+            dist += diff
+        return np.argmin(dist, axis=1)
+    return kernel
+
+
+_ASSIGN_KERNELS = {vs: _make_assign_kernel(vs) for vs in (2, 4, 8, 16)}
+
+
+def _nearest(vf, codebook_f):
+    """Index of the nearest codebook entry for each row of vf."""
+    vec_size = vf.shape[1]
+    kernel = _ASSIGN_KERNELS.get(vec_size) or _make_assign_kernel(vec_size)
+    return kernel(vf, codebook_f)
+
+
 def _kmeans(vectors, n_codes=256, n_iter=20, max_level=30):
     """Train codebook via k-means on integer vectors.
 
@@ -68,14 +101,16 @@ def _kmeans(vectors, n_codes=256, n_iter=20, max_level=30):
         codebook = np.clip(np.round(codebook), 0, max_level).astype(np.uint8)
         return codebook, assignments
 
-    # k-means++ initialization
+    # k-means++ initialization.  Each vector's distance to its nearest
+    # chosen centroid is kept up to date with just the newest centroid,
+    # rather than recomputed against all of them every step.
     rng = np.random.RandomState(42)
     indices = [rng.randint(n_vecs)]
+    dists = np.sum((vf - vf[indices[0]]) ** 2, axis=1)
     for _ in range(1, min(n_codes, n_vecs)):
-        cb_so_far = vf[indices]
-        dists = np.min(
-            np.sum((vf[:, None, :] - cb_so_far[None, :, :]) ** 2, axis=2),
-            axis=1)
+        if len(indices) > 1:
+            np.minimum(dists, np.sum((vf - vf[indices[-1]]) ** 2, axis=1),
+                       out=dists)
         total = dists.sum()
         if total < 1e-30:
             probs = np.ones(n_vecs) / n_vecs
@@ -92,8 +127,7 @@ def _kmeans(vectors, n_codes=256, n_iter=20, max_level=30):
         out = np.empty(n_vecs, dtype=np.int32)
         for s in range(0, n_vecs, chunk_size):
             e = min(s + chunk_size, n_vecs)
-            d = np.sum((vf[s:e, None, :] - cb[None, :, :]) ** 2, axis=2)
-            out[s:e] = np.argmin(d, axis=1)
+            out[s:e] = _nearest(vf[s:e], cb)
         return out
 
     for iteration in range(n_iter):
@@ -128,9 +162,7 @@ def _chunked_assign(vectors_f, codebook_f, chunk_size=50000):
     out = np.empty(n_vecs, dtype=np.uint8)
     for s in range(0, n_vecs, chunk_size):
         e = min(s + chunk_size, n_vecs)
-        d = np.sum((vectors_f[s:e, None, :] - codebook_f[None, :, :]) ** 2,
-                   axis=2)
-        out[s:e] = np.argmin(d, axis=1).astype(np.uint8)
+        out[s:e] = _nearest(vectors_f[s:e], codebook_f)
     return out
 
 
@@ -219,12 +251,16 @@ def vq_encode_bank(indices, vec_size, max_level=30, n_iter=20, gate=5):
 
 
 def vq_encode_banks(indices, vec_size=8, max_banks=64,
-                    max_level=30, n_iter=20, gate=5, progress_fn=None):
+                    max_level=30, n_iter=20, gate=5, progress_fn=None,
+                    jobs=1):
     """Encode all POKEY indices into VQ banks with per-bank codebooks.
 
     Args:
         indices: POKEY level indices (bytes or numpy array)
         gate: Noise gate strength 0–100 (0 = off, default 5).
+        jobs: Worker processes.  Every bank but the last holds exactly
+            samples_per_bank samples, so banks are trained independently
+            and the result does not depend on this.
 
     Returns:
         (banks, samples_encoded)
@@ -239,29 +275,39 @@ def vq_encode_banks(indices, vec_size=8, max_banks=64,
 
     cb_bytes, idx_per_bank, samp_per_bank = vq_bank_geometry(vec_size)
     total = len(indices)
+    usable = min(total - total % vec_size, max_banks * samp_per_bank)
+    chunks = [indices[s:s + samp_per_bank]
+              for s in range(0, usable, samp_per_bank)]
+    encode = functools.partial(vq_encode_bank, vec_size=vec_size,
+                               max_level=max_level, n_iter=n_iter, gate=gate)
+
+    pool = None
+    futures = []
+    if jobs > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(chunks)))
+        futures = [pool.submit(encode, chunk) for chunk in chunks]
     banks = []
     pos = 0
-
-    while pos < total and len(banks) < max_banks:
-        remaining = total - pos
-        chunk_size = min(samp_per_bank, remaining)
-        chunk_size = (chunk_size // vec_size) * vec_size
-        if chunk_size == 0:
-            break
-
-        chunk = indices[pos:pos + chunk_size]
-        bank_data, n_encoded = vq_encode_bank(
-            chunk, vec_size, max_level, n_iter, gate=gate)
-
-        # Pad bank to BANK_SIZE
-        if len(bank_data) < BANK_SIZE:
-            bank_data = bank_data + bytes(BANK_SIZE - len(bank_data))
-
-        banks.append(bank_data)
-        pos += n_encoded
-
-        if progress_fn:
-            progress_fn(pos, total, len(banks))
+    try:
+        for bank_data, n_encoded in ((f.result() for f in futures) if pool
+                                     else map(encode, chunks)):
+            # Pad bank to BANK_SIZE
+            if len(bank_data) < BANK_SIZE:
+                bank_data = bank_data + bytes(BANK_SIZE - len(bank_data))
+
+            banks.append(bank_data)
+            pos += n_encoded
+
+            if progress_fn:
+                progress_fn(pos, total, len(banks))
+    finally:
+        if pool:
+            # Drop queued banks on early exit (shutdown(cancel_futures=)
+            # needs Python 3.9)
+            for f in futures:
+                f.cancel()
+            pool.shutdown()
 
     return banks, pos
 
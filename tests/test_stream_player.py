@@ -107,6 +107,15 @@ class TestAudio(unittest.TestCase):
         expected_len = int(1000 * 15000 / 44100)
         self.assertAlmostEqual(len(out), expected_len, delta=2)
 
+    def test_resample_integer_ratio(self):
+        t = np.arange(4800) / 48000
+        audio = np.stack([np.sin(2 * np.pi * 440 * t)] * 2, axis=1)
+        out = resample(audio.astype(np.float32), 48000, 8000)
+        self.assertEqual(out.shape, (800, 2))
+        self.assertEqual(out.dtype, np.float32)
+        # The 440 Hz tone passes through the anti-alias filter intact
+        self.assertAlmostEqual(np.abs(out[100:-100]).max(), 1.0, delta=0.05)
+
     def test_find_divisor(self):
         div, rate, audctl = find_best_divisor(15000)
         self.assertGreater(rate, 10000)
@@ -178,16 +187,65 @@ class TestCompression(unittest.TestCase):
     def test_compress_banks(self):
         np.random.seed(42)
         indices = bytes(np.random.randint(0, 31, 50000, dtype=np.uint8))
-        banks, pos = compress_banks(indices, bank_size=2048, max_banks=64)
+        banks, pos, total = compress_banks(indices, bank_size=2048, max_banks=64)
         self.assertGreaterEqual(len(banks), 1)
         self.assertEqual(pos, len(indices))
         for b in banks:
             self.assertLessEqual(len(b), 2048)
+        self.assertEqual(total, sum(len(b) for b in banks))
         result = bytearray()
         for bank_data in banks:
             result.extend(decompress_bank(bank_data))
         self.assertEqual(bytes(result), indices)
 
+    def test_prefix_sizes_match_compression(self):
+        """Bank-size probes agree with compressing each prefix."""
+        from stream_player.compress import _PrefixSizer
+        np.random.seed(7)
+        t = np.arange(20000)
+        sig = np.sin(t / 30.0) * 12 + 15 + np.random.randn(20000) * 0.7
+        indices = bytes(np.clip(sig, 0, 30).astype(np.uint8))
+        limit = 4096
+        sizer = _PrefixSizer(indices, 9, 16000, True, limit, 1000)
+        for x in (19000, 1, 66, 67, 500, 3000, 8000, 12345, 20000):
+            real = len(compress_bank(indices[:x], 9, 16000)[0])
+            got = sizer.size(x)
+            if real <= limit:
+                self.assertEqual(got, real, x)
+            else:
+                self.assertGreater(got, limit, x)
+
+    def test_incompressible_run(self):
+        """Long literal runs switch to skipping search and stay exact."""
+        from stream_player.compress import _PrefixSizer
+        np.random.seed(3)
+        indices = bytes(np.random.randint(0, 256, 12000, dtype=np.uint8))
+        comp, _ = compress_bank(indices, 0)
+        self.assertEqual(decompress_bank(comp), indices)
+        sizer = _PrefixSizer(indices, 0, 0, True, 1 << 20, 1000)
+        for x in (3000, 5000, 9999, 12000):
+            self.assertEqual(sizer.size(x),
+                             len(compress_bank(indices[:x], 0)[0]), x)
+
+    def test_compress_banks_parallel(self):
+        """Segments packed in worker processes form one valid stream."""
+        np.random.seed(42)
+        indices = bytes(np.random.randint(0, 31, 50000, dtype=np.uint8))
+        banks, pos, total = compress_banks(indices, bank_size=2048,
+                                           max_banks=64, jobs=2)
+        self.assertEqual(pos, len(indices))
+        self.assertEqual(total, sum(len(b) for b in banks))
+        for b in banks:
+            self.assertLessEqual(len(b), 2048)
+        result = b''.join(decompress_bank(b) for b in banks)
+        self.assertEqual(result, indices)
+
+        # When the bank limit binds, -j must not cost any audio
+        serial = compress_banks(indices, bank_size=2048, max_banks=12)
+        self.assertLess(serial[1], len(indices))
+        self.assertEqual(compress_banks(indices, bank_size=2048,
+                                        max_banks=12, jobs=2), serial)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # Bank Layout Tests
@@ -254,6 +312,40 @@ class TestVQ(unittest.TestCase):
         self.assertGreater(n_enc, 0)
         self.assertGreater(len(banks), 0)
 
+    def test_parallel_matches_serial(self):
+        from stream_player.vq import vq_encode_banks
+        rng = np.random.RandomState(7)
+        indices = (np.cumsum(rng.randint(-2, 3, 80000)) % 31).astype(np.uint8)
+        for max_banks in (2, 64):
+            serial = vq_encode_banks(indices, vec_size=2, max_banks=max_banks,
+                                     max_level=30, n_iter=5)
+            parallel = vq_encode_banks(indices, vec_size=2,
+                                       max_banks=max_banks, max_level=30,
+                                       n_iter=5, jobs=2)
+            self.assertEqual(serial, parallel)
+        self.assertEqual(serial[1], len(indices))
+
+    def test_parallel_progress_error_propagates(self):
+        """A failing progress callback stops a parallel encode cleanly."""
+        from stream_player.vq import vq_encode_banks
+
+        def progress(pos, total, n_banks):
+            raise KeyboardInterrupt
+
+        from concurrent.futures import ProcessPoolExecutor
+        from unittest import mock
+        shutdown = ProcessPoolExecutor.shutdown
+
+        def shutdown_38(pool, wait=True):  # Python 3.8 signature
+            return shutdown(pool, wait)
+
+        indices = np.random.RandomState(3).randint(0, 31, 80000).astype(np.uint8)
+        with mock.patch.object(ProcessPoolExecutor, 'shutdown', shutdown_38):
+            with self.assertRaises(KeyboardInterrupt):
+                vq_encode_banks(indices, vec_size=2, max_banks=64,
+                                max_level=30, n_iter=5, jobs=2,
+                                progress_fn=progress)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # ASM Project Generation Tests
@@ -311,7 +403,7 @@ class TestAsmProject(unittest.TestCase):
         from stream_player.asm_project import generate_project
 
         data = bytes(np.random.randint(0, 31, 8000, dtype=np.uint8))
-        banks, _ = compress_banks(data, bank_size=16384, max_banks=64)
+        banks, _, _ = compress_banks(data, bank_size=16384, max_banks=64)
         outdir = os.path.join(self.tmpdir, 'lz')
 
         generate_project(outdir, banks, 'lz', 0xDD, 0x40, 7988.5,
@@ -366,6 +458,17 @@ class TestAsmProject(unittest.TestCase):
         # No table for channels 3-4
         self.assertNotIn('audc3_tab:', content)
 
+    def test_screen_codes(self):
+        """Splash text maps to 40 ANTIC screen codes."""
+        from stream_player.splash_utils import to_screen_codes
+        codes = to_screen_codes('A b_\t')
+        self.assertEqual(len(codes), 40)
+        self.assertEqual(list(codes[:5]), [0x21, 0x00, 0x62, 0x3F, 0x00])
+        self.assertEqual(len(to_screen_codes('X' * 50)), 40)
+        # Non-Latin-1 characters are blank, one code per character
+        codes = to_screen_codes('\u0416\U0001F3B5?\u00e9Z')
+        self.assertEqual(list(codes[:5]), [0x00, 0x00, 0x1F, 0x00, 0x3A])
+
     def test_all_channel_vec_combinations(self):
         """All pokey_channels × vec_size combinations generate valid projects."""
         from stream_player.asm_project import generate_project
@@ -411,6 +514,52 @@ class TestAsmProject(unittest.TestCase):
         self.assertTrue(xex.startswith(b'\xFF\xFF'))
         self.assertGreater(len(xex), 1000)
 
+    def test_builtin_assembler_reuses_identical_project(self):
+        """A project with unchanged sources is not assembled again."""
+        from unittest import mock
+        from stream_player.asm_project import generate_project, try_assemble
+
+        banks = split_into_banks(bytes([15] * 100))
+        first = os.path.join(self.tmpdir, 'first')
+        second = os.path.join(self.tmpdir, 'second')
+        generate_project(first, banks, 'raw', 0xDD, 0x41, 7988.5)
+        generate_project(second, banks, 'raw', 0xDD, 0x41, 7988.5)
+
+        xex_path, _ = try_assemble(first)
+        with mock.patch('stream_player.simple_mads.assemble',
+                        side_effect=AssertionError('re-assembled')):
+            again, method = try_assemble(second)
+        self.assertEqual(method, 'built-in')
+        with open(xex_path, 'rb') as a, open(again, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_direct_bank_xex_matches_assembled(self):
+        """Splicing banks into a player-only XEX matches full assembly."""
+        from stream_player.asm_project import (generate_project, try_assemble,
+                                               write_xex_with_banks)
+
+        data = bytes(np.random.randint(0, 31, BANK_SIZE + 500, dtype=np.uint8))
+        banks = split_into_banks(data)
+        full_dir = os.path.join(self.tmpdir, 'full')
+        player_dir = os.path.join(self.tmpdir, 'player')
+
+        generate_project(full_dir, banks, 'raw', 0xDD, 0x40, 7988.5)
+        generate_project(player_dir, banks, 'raw', 0xDD, 0x40, 7988.5,
+                         bank_sources=False)
+        self.assertFalse(os.path.exists(
+            os.path.join(player_dir, 'bank_00.asm')))
+
+        full_xex, _ = try_assemble(full_dir)
+        player_xex, _ = try_assemble(player_dir)
+        out_path = os.path.join(self.tmpdir, 'direct.xex')
+        written = write_xex_with_banks(player_xex, banks, out_path)
+
+        with open(full_xex, 'rb') as f:
+            expected = f.read()
+        self.assertEqual(written, len(expected))
+        with open(out_path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # End-to-End Tests (ASM project generation via CLI)
@@ -418,6 +567,15 @@ class TestAsmProject(unittest.TestCase):
 
 class TestEndToEnd(unittest.TestCase):
 
+    def setUp(self):
+        # Keep the default encoding cache out of the user's ~/.cache
+        from unittest import mock
+        cache_home = tempfile.mkdtemp(prefix='test_cache_')
+        self.addCleanup(shutil.rmtree, cache_home, ignore_errors=True)
+        patcher = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': cache_home})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def _make_test_wav(self, path, duration=0.5, sr=44100):
         t = np.linspace(0, duration, int(sr * duration), dtype=np.float32)
         samples = (np.sin(2 * np.pi * 440 * t) * 0.5 * 32767).astype(np.int16)
@@ -496,6 +654,167 @@ class TestEndToEnd(unittest.TestCase):
             if os.path.isdir(asm_dir):
                 shutil.rmtree(asm_dir)
 
+    def test_encoding_cache_reused(self):
+        """Second run with the same settings reuses the cached indices."""
+        tmp = tempfile.mkdtemp()
+        wav_path = os.path.join(tmp, 'in.wav')
+        cache_dir = os.path.join(tmp, 'cache')
+        try:
+            self._make_test_wav(wav_path, duration=0.5)
+            from unittest import mock
+            from stream_player.cli import main
+            outputs = []
+            for i in range(2):
+                base = os.path.join(tmp, f'out{i}')
+                args = [wav_path, '-c', 'lz', '-o', base,
+                        '--cache-dir', cache_dir]
+                if i == 0:
+                    result = main(args)
+                else:
+                    # A full cache hit never decodes the input
+                    with mock.patch('stream_player.audio.load_audio',
+                                    side_effect=AssertionError):
+                        result = main(args)
+                self.assertEqual(result, 0)
+                with open(base + '.xex', 'rb') as fh:
+                    outputs.append(fh.read())
+            self.assertEqual(outputs[0], outputs[1])
+
+            def entries():
+                return sorted(os.path.splitext(n)[1]
+                              for n in os.listdir(cache_dir))
+            self.assertEqual(entries(), ['.idx', '.src'])
+
+            # Different encoder settings get their own entry
+            main([wav_path, '-c', 'lz', '-n', '3', '-o',
+                  os.path.join(tmp, 'out2'), '--cache-dir', cache_dir])
+            self.assertEqual(entries(), ['.idx', '.idx', '.src'])
+
+            # Over the size limit, least recently used entries go first
+            from stream_player import cli
+            src_entry = [n for n in os.listdir(cache_dir)
+                         if n.endswith('.src')][0]
+            os.utime(os.path.join(cache_dir, src_entry), ns=(0, 0))
+            total = sum(os.path.getsize(os.path.join(cache_dir, n))
+                        for n in os.listdir(cache_dir))
+            cli._prune_cache(cache_dir, total)
+            self.assertEqual(entries(), ['.idx', '.idx', '.src'])
+            cli._prune_cache(cache_dir, total - 1)
+            self.assertEqual(entries(), ['.idx', '.idx'])
+
+            # A new encoder revision does not reuse old entries
+            with mock.patch.object(cli, '_CACHE_FORMAT',
+                                   cli._CACHE_FORMAT + 1):
+                main([wav_path, '-c', 'lz', '-n', '3', '-o',
+                      os.path.join(tmp, 'out2'), '--cache-dir', cache_dir])
+            self.assertEqual(entries(), ['.idx', '.idx', '.idx', '.src'])
+
+            shutil.rmtree(cache_dir)
+            main([wav_path, '-c', 'lz', '-o', os.path.join(tmp, 'out3'),
+                  '--cache-dir', cache_dir, '--no-cache'])
+            self.assertFalse(os.path.exists(cache_dir))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_resample_decimates_to_pokey_rate(self):
+        """The CLI's POKEY rate takes the decimate-then-FFT resample path."""
+        import scipy.signal
+        from unittest import mock
+        from stream_player.audio import find_best_divisor
+        tmp = tempfile.mkdtemp()
+        wav_path = os.path.join(tmp, 'in.wav')
+        try:
+            self._make_test_wav(wav_path, duration=0.5)
+            actual_rate = find_best_divisor(8000)[1]
+            self.assertNotEqual(44100 % int(actual_rate), 0)
+            from stream_player.cli import main
+            with mock.patch('scipy.signal.decimate',
+                            wraps=scipy.signal.decimate) as decimate:
+                result = main([wav_path, '-c', 'off', '-o',
+                               os.path.join(tmp, 'out'), '--no-cache'])
+            self.assertEqual(result, 0)
+            decimate.assert_called_once()
+            self.assertEqual(decimate.call_args[0][1],
+                             int(44100 / (1.25 * int(actual_rate))))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_failed_xex_waits_for_asm_writer(self):
+        """A failing XEX build still joins and reports the ASM writer."""
+        import io
+        import threading
+        from unittest import mock
+        from stream_player import cli
+        from stream_player.errors import XEXBuildError
+        tmp = tempfile.mkdtemp()
+        wav_path = os.path.join(tmp, 'in.wav')
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow_asm(asm_path, project):
+            release.wait(5)
+            finished.set()
+            raise OSError('disk full')
+
+        def failing_xex(*args):
+            release.set()
+            raise XEXBuildError('assembler failed')
+
+        try:
+            self._make_test_wav(wav_path, duration=0.5)
+            stderr = io.StringIO()
+            with mock.patch.object(cli, '_build_asm_output', slow_asm), \
+                    mock.patch.object(cli, '_build_xex_output', failing_xex), \
+                    mock.patch('sys.stderr', stderr):
+                result = cli.main([wav_path, '-x', '-a', '-c', 'off', '-o',
+                                   os.path.join(tmp, 'out'), '--no-cache'])
+            self.assertEqual(result, 1)
+            self.assertTrue(finished.is_set())
+            self.assertIn('disk full', stderr.getvalue())
+            self.assertIn('assembler failed', stderr.getvalue())
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_missing_input_with_cache(self):
+        """A missing input still fails cleanly when the cache is on."""
+        import io
+        from unittest import mock
+        tmp = tempfile.mkdtemp()
+        try:
+            from stream_player.cli import main
+            stderr = io.StringIO()
+            with mock.patch('sys.stderr', stderr):
+                result = main([os.path.join(tmp, 'missing.wav'), '-o',
+                               os.path.join(tmp, 'out'),
+                               '--cache-dir', os.path.join(tmp, 'cache')])
+            self.assertEqual(result, 1)
+            self.assertIn('File not found', stderr.getvalue())
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_server_mode_runs_each_line(self):
+        """--server runs one job per stdin line and survives failures."""
+        import io
+        from unittest import mock
+        tmp = tempfile.mkdtemp()
+        wav_path = os.path.join(tmp, 'in.wav')
+        try:
+            self._make_test_wav(wav_path, duration=0.5)
+            jobs = (f'"{wav_path}" -o "{os.path.join(tmp, "a")}"\n'
+                    f'\n'
+                    f'"{os.path.join(tmp, "missing.wav")}"\n'
+                    f'"{wav_path}" -c off -o "{os.path.join(tmp, "b")}"\n')
+            from stream_player.cli import main
+            with mock.patch('sys.stdin', io.StringIO(jobs)):
+                result = main(['--server', '-a', '-c', 'lz', '--no-cache'])
+            self.assertEqual(result, 1)  # the missing file
+            with open(os.path.join(tmp, 'a_asm', 'config.asm')) as fh:
+                self.assertIn('COMPRESS_MODE   = 1', fh.read())
+            with open(os.path.join(tmp, 'b_asm', 'config.asm')) as fh:
+                self.assertIn('COMPRESS_MODE   = 0', fh.read())
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # Enhancement Tests
@@ -528,6 +847,21 @@ class TestEnhance(unittest.TestCase):
         result = compress_dynamics(audio, strength=0.0)
         np.testing.assert_array_equal(audio, result)
 
+    def test_quantize_shaped2(self):
+        from stream_player.enhance import quantize_shaped2
+        from stream_player.tables import build_nch_table
+        table = build_nch_table(2)[0]
+        # Exact table levels produce no error to feed back
+        levels = np.array([0, 5, 17, 30, 30, 12], dtype=np.uint8)
+        out = quantize_shaped2(table[levels], table)
+        np.testing.assert_array_equal(out, levels)
+        # Shaped error keeps a mid-level input averaging to that level
+        target = (table[10] + table[11]) / 2
+        out = quantize_shaped2(np.full(4000, target, np.float32), table)
+        self.assertTrue(set(np.unique(out)) <= set(range(8, 14)))
+        self.assertAlmostEqual(float(np.mean(table[out])), target,
+                               delta=0.02 * float(table[-1]))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)